@@ -1,8 +1,31 @@
 from flask import Flask
 from flask_cors import CORS
+import logging
 import os
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider using orjson for jsonify() and request.get_json()"""
+        
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 def create_app():
     """Create and configure the Flask application."""
     
@@ -19,6 +42,42 @@ def create_app():
                 static_folder=static_dir)
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
     
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
+    
+    # Quiet per-request logging in production; set LOG_LEVEL=DEBUG to trace chats
+    app.logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING').upper())
+    
+    # Server-side sessions in Redis: only an opaque session id travels in the cookie
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            from flask_session import Session
+            
+            app.config.update(
+                SESSION_TYPE='redis',
+                SESSION_REDIS=redis.Redis.from_url(redis_url)
+            )
+            Session(app)
+        except ImportError as e:
+            app.logger.warning("REDIS_URL set but server-side sessions unavailable: %s", e)
+    
+    # Serve /static from WhiteNoise (files indexed once, compressed variants, cache
+    # headers) so asset requests never reach Flask's per-request file handler.
+    # Asset URLs are not content-hashed, so keep max-age short and rely on ETags.
+    try:
+        from whitenoise import WhiteNoise
+        app.wsgi_app = WhiteNoise(
+            app.wsgi_app,
+            root=static_dir,
+            prefix='static/',
+            max_age=int(os.environ.get('STATIC_MAX_AGE', 3600)),
+            autorefresh=app.debug
+        )
+    except ImportError:
+        pass
+    
     # Enable CORS for all routes
     CORS(app)
     
@@ -1,19 +1,36 @@
 import os
-from typing import Dict, List, Any
+import logging
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Iterator, List, Mapping
 import uuid
 
+from app.utils.conversation_store import create_conversation_store
+
+logger = logging.getLogger(__name__)
+
 class AIPhilosopherChat:
     """Enhanced philosopher chat using AI generation"""
     
+    # Messages kept per conversation (user + assistant turns)
+    MAX_HISTORY = 6
+    
+    # Opening line per philosopher, shared read-only by every instance
+    _GREETINGS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        'camus': "Welcome, fellow seeker of the absurd. In a world without inherent meaning, what profound questions weigh on your mind today?",
+        'dostoevsky': "Ah, another soul wrestling with the complexities of existence. The human heart is a mysterious labyrinth - what moral or psychological depths shall we explore?",
+        'nietzsche': "What does not destroy you makes you stronger! I sense you wish to overcome something, to become who you truly are. What conventional wisdom shall we shatter today?",
+        'neutral': "Welcome to the realm of philosophical inquiry! I'm here to guide you through the profound questions that have shaped human thought for millennia. What would you like to explore?"
+    })
+    
     def __init__(self):
         """Initialize with AI-enhanced RAG engine."""
-        print("🤖 Starting AI-Enhanced Philosopher Chat...")
+        logger.debug("🤖 Starting AI-Enhanced Philosopher Chat...")
         
         from app.utils.ai_rag_engine import AIEnhancedRAGEngine
         self.rag_engine = AIEnhancedRAGEngine()
         
-        self.conversation_history = {}
-        print("✅ AI Philosopher Chat ready!")
+        self.conversation_history = create_conversation_store(max_messages=self.MAX_HISTORY)
+        logger.debug("✅ AI Philosopher Chat ready!")
     
     def generate_response(
         self, 
@@ -38,27 +55,17 @@ class AIPhilosopherChat:
                 full_context
             )
             
-            # Update conversation history
-            if conversation_id not in self.conversation_history:
-                self.conversation_history[conversation_id] = []
-            
-            self.conversation_history[conversation_id].append({
-                "role": "user", 
-                "content": user_message
-            })
-            self.conversation_history[conversation_id].append({
-                "role": "assistant", 
-                "content": response_data['message']
-            })
-            
-            # Keep only last 6 messages to avoid memory issues
-            if len(self.conversation_history[conversation_id]) > 6:
-                self.conversation_history[conversation_id] = self.conversation_history[conversation_id][-6:]
+            # Update conversation history (the store drops the oldest messages)
+            self.conversation_history.append(
+                conversation_id,
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": response_data['message']}
+            )
             
             return response_data
             
         except Exception as e:
-            print(f"Error in AI response generation: {e}")
+            logger.exception("Error in AI response generation: %s", e)
             return {
                 'message': "I apologize, but I'm having difficulty responding right now. This question touches on deep philosophical themes that deserve careful consideration. Perhaps we could explore it from a different angle?",
                 'sources': [],
@@ -66,22 +73,30 @@ class AIPhilosopherChat:
                 'generated_by': 'error_fallback'
             }
     
+    def chat_stream(self, user_message: str, philosopher: str, conversation_id: str) -> Iterator[str]:
+        """Stream an AI-powered response with RAG context as it is generated."""
+        context = self.rag_engine.retrieve_context(user_message, philosopher)
+        parts = []
+        for delta in self.rag_engine.generate_ai_response_stream(user_message, philosopher, context):
+            parts.append(delta)
+            yield delta
+        
+        # Record the finished exchange, as generate_response does
+        self.conversation_history.append(
+            conversation_id,
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": ''.join(parts).strip()}
+        )
+    
     def clear_conversation(self, conversation_id: str):
         """Clear conversation history for a given ID."""
-        if conversation_id in self.conversation_history:
-            del self.conversation_history[conversation_id]
-            print(f"Cleared conversation {conversation_id}")
+        if self.conversation_history.clear(conversation_id):
+            logger.debug("Cleared conversation %s", conversation_id)
     
     def get_philosopher_greeting(self, philosopher: str) -> str:
         """Get personalized greeting for philosopher."""
-        greetings = {
-            'camus': "Welcome, fellow seeker of the absurd. In a world without inherent meaning, what profound questions weigh on your mind today?",
-            'dostoevsky': "Ah, another soul wrestling with the complexities of existence. The human heart is a mysterious labyrinth - what moral or psychological depths shall we explore?",
-            'nietzsche': "What does not destroy you makes you stronger! I sense you wish to overcome something, to become who you truly are. What conventional wisdom shall we shatter today?",
-            'neutral': "Welcome to the realm of philosophical inquiry! I'm here to guide you through the profound questions that have shaped human thought for millennia. What would you like to explore?"
-        }
-        return greetings.get(philosopher, greetings['neutral'])
+        return self._GREETINGS.get(philosopher, self._GREETINGS['neutral'])
     
     def get_conversation_context(self, conversation_id: str) -> List[Dict[str, str]]:
         """Get recent conversation history for context."""
-        return self.conversation_history.get(conversation_id, [])[-4:]  # Last 4 exchanges
\ No newline at end of file
+        return self.conversation_history.get(conversation_id)[-4:]  # Last 4 exchanges
\ No newline at end of file
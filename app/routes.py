@@ -1,28 +1,42 @@
-from flask import Blueprint, render_template, request, jsonify, session, Response
+from flask import Blueprint, render_template, request, session, Response
 import logging
 import os
-import uuid
-import json
+import re
+import threading
 import time
+import json
 import asyncio
+import hashlib
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from io import BytesIO
 
+from cachetools import TTLCache
+
+from app.utils.conversation_store import create_conversation_log
+from app.utils.semantic_cache import SemanticCache, SENTENCE_TRANSFORMERS_AVAILABLE
+from app.utils.stream_buffer import create_stream_buffers
+
+logger = logging.getLogger(__name__)
+
 # Import all available chat systems for maximum flexibility
 try:
     from app.utils.groq_philosophy_chat import GroqPhilosopherChat
     GROQ_AVAILABLE = True
-    logging.info("✅ GROQ Chat Engine loaded successfully")
+    logger.debug("✅ GROQ Chat Engine loaded successfully")
 except ImportError as e:
     GROQ_AVAILABLE = False
-    logging.warning(f"⚠️ GROQ Chat not available: {e}")
+    logger.warning("⚠️ GROQ Chat not available: %s", e)
 
 try:
     from app.utils.internet_rag_engine import ModernPhilosopherChat
     INTERNET_RAG_AVAILABLE = True
-    logging.info("✅ Internet RAG Engine loaded successfully")
+    logger.debug("✅ Internet RAG Engine loaded successfully")
 except ImportError as e:
     INTERNET_RAG_AVAILABLE = False
-    logging.warning(f"⚠️ Internet RAG not available: {e}")
+    logger.warning("⚠️ Internet RAG not available: %s", e)
 
 # AI-enhanced system fallback
 try:
@@ -40,8 +54,351 @@ try:
 except ImportError:
     EDGE_TTS_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _env_flag(name, default='true'):
+    return os.getenv(name, default).lower() == 'true'
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment configuration, read once at import instead of in request handlers"""
+    api_type: str
+    use_internet_search: bool
+    primary_model: str
+    fallback_model: str
+    static_max_age: int
+    semantic_cache: bool
+    semantic_cache_threshold: float
+    semantic_cache_ttl: int
+    
+    @classmethod
+    def from_env(cls):
+        return cls(
+            api_type=os.getenv('API_TYPE', 'groq').lower(),
+            use_internet_search=_env_flag('USE_INTERNET_SEARCH'),
+            primary_model=os.getenv('PRIMARY_MODEL', 'meta-llama/Llama-2-70b-chat-hf'),
+            fallback_model=os.getenv('FALLBACK_MODEL', 'microsoft/DialoGPT-large'),
+            static_max_age=int(os.getenv('STATIC_MAX_AGE', '3600')),
+            semantic_cache=_env_flag('SEMANTIC_CACHE'),
+            semantic_cache_threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.9')),
+            semantic_cache_ttl=int(os.getenv('SEMANTIC_CACHE_TTL', '3600'))
+        )
+
+SETTINGS = Settings.from_env()
+
 main = Blueprint('main', __name__)
 
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _json(obj, status=200):
+    """Build a JSON response without going through jsonify's stdlib encoder"""
+    return Response(_dumps(obj), status=status, mimetype='application/json')
+
+# Static API payloads, serialized once at import
+PHILOSOPHERS = {
+    'camus': {
+        'name': 'Albert Camus',
+        'description': 'French philosopher known for absurdism and existentialism',
+        'period': '1913-1960',
+        'specialties': ['Absurdism', 'Revolt', 'The Stranger'],
+        'key_concepts': ['Absurdism', 'Revolt', 'The Stranger']
+    },
+    'nietzsche': {
+        'name': 'Friedrich Nietzsche', 
+        'description': 'German philosopher who declared "God is dead"',
+        'period': '1844-1900',
+        'specialties': ['Will to Power', 'Übermensch', 'Eternal Recurrence'],
+        'key_concepts': ['Will to Power', 'Übermensch', 'Eternal Recurrence']
+    },
+    'dostoevsky': {
+        'name': 'Fyodor Dostoevsky',
+        'description': 'Russian novelist and philosopher exploring human psychology',
+        'period': '1821-1881',
+        'specialties': ['Free will', 'Suffering', 'Faith vs. Reason'],
+        'key_concepts': ['Free will', 'Suffering', 'Faith vs. Reason']
+    },
+    'sartre': {
+        'name': 'Jean-Paul Sartre',
+        'description': 'Existentialist philosopher of freedom and responsibility', 
+        'period': '1905-1980',
+        'specialties': ['Existentialism', 'Freedom', 'Bad Faith'],
+        'key_concepts': ['Existentialism', 'Freedom', 'Bad Faith']
+    },
+    'beauvoir': {
+        'name': 'Simone de Beauvoir',
+        'description': 'Existential feminist exploring ethics and oppression',
+        'period': '1908-1986',
+        'specialties': ['Existential Feminism', 'Ethics of Ambiguity', 'Gender'],
+        'key_concepts': ['Existential Feminism', 'Ethics of Ambiguity', 'Gender']
+    },
+    'kant': {
+        'name': 'Immanuel Kant',
+        'description': 'Critical philosopher of reason and moral duty',
+        'period': '1724-1804',
+        'specialties': ['Categorical Imperative', 'Critical Philosophy', 'Ethics'],
+        'key_concepts': ['Categorical Imperative', 'Critical Philosophy', 'Ethics']
+    },
+    'aristotle': {
+        'name': 'Aristotle',
+        'description': 'Ancient philosopher of virtue ethics and practical wisdom',
+        'period': '384-322 BCE',
+        'specialties': ['Virtue Ethics', 'Practical Wisdom', 'Human Flourishing'],
+        'key_concepts': ['Virtue Ethics', 'Practical Wisdom', 'Human Flourishing']
+    },
+    'socrates': {
+        'name': 'Socrates',
+        'description': 'Classical Greek philosopher, father of Western philosophy and the Socratic method',
+        'period': '470-399 BCE',
+        'specialties': ['Socratic Method', 'Self-Knowledge', 'Virtue Ethics'],
+        'key_concepts': ['Know Thyself', 'Unexamined Life', 'Virtue is Knowledge', 'Socratic Irony']
+    },
+    'marcus': {
+        'name': 'Marcus Aurelius',
+        'description': 'Stoic emperor-philosopher emphasizing virtue and acceptance',
+        'period': '121-180 CE',
+        'specialties': ['Stoicism', 'Virtue', 'Inner Peace'],
+        'key_concepts': ['Stoicism', 'Virtue', 'Inner Peace']
+    },
+    'kafka': {
+        'name': 'Franz Kafka',
+        'description': 'Czech writer exploring existential anxiety, alienation, and bureaucratic absurdity',
+        'period': '1883-1924',
+        'specialties': ['Existential Anxiety', 'Alienation', 'Absurdity', 'Bureaucracy'],
+        'key_concepts': ['The Absurd', 'Metamorphosis', 'Guilt', 'Isolation', 'Kafkaesque']
+    },
+    'cioran': {
+        'name': 'Emil Cioran',
+        'description': 'Romanian-French philosopher known for his pessimistic insights and aphoristic style',
+        'period': '1911-1995',
+        'specialties': ['Pessimism', 'Aphorisms', 'Despair', 'Insomnia'],
+        'key_concepts': ['The Trouble with Being Born', 'Lucidity', 'Nihilism', 'Sleeplessness']
+    },
+    'neutral': {
+        'name': 'Philosophy Guide',
+        'description': 'Neutral philosophical discussion without specific persona',
+        'period': 'Modern',
+        'specialties': ['General Philosophy', 'Critical Thinking', 'Ethics'],
+        'key_concepts': ['General Philosophy', 'Critical Thinking', 'Ethics']
+    }
+}
+
+SUGGESTED_TOPICS = [
+    "What is the meaning of life in the digital age?",
+    "Do we have free will in a deterministic universe?",
+    "Is existence absurd? How do we find purpose?",
+    "What is consciousness? Are we more than our neurons?",
+    "How should we live ethically in modern society?",
+    "What is truth in an era of information overload?",
+    "How do we find meaning after traditional beliefs?",
+    "What is justice in an unequal world?",
+    "Is suffering necessary for growth and wisdom?",
+    "How do we stay human in an AI-dominated future?",
+    "What are our obligations to future generations?",
+    "How do we balance individual freedom with social responsibility?",
+    "What does it mean to live authentically today?",
+    "How do we cope with existential anxiety?",
+    "What is the role of technology in human flourishing?"
+]
+
+_PHILOSOPHERS_JSON = _dumps(PHILOSOPHERS)
+_TOPICS_JSON = _dumps(SUGGESTED_TOPICS)
+_PHILOSOPHERS_ETAG = hashlib.blake2b(_PHILOSOPHERS_JSON, digest_size=8).hexdigest()
+_TOPICS_ETAG = hashlib.blake2b(_TOPICS_JSON, digest_size=8).hexdigest()
+
+# Canonical philosopher keys, so every request carries the same key object
+_PHILOSOPHER_KEYS = {key: key for key in PHILOSOPHERS}
+
+def _canonical_philosopher(value):
+    """Map a client-supplied philosopher to one of the PHILOSOPHERS keys.
+    
+    Missing means 'neutral'; an unknown name returns None so the route can reject it.
+    """
+    if value is None:
+        return 'neutral'
+    if not isinstance(value, str):
+        return None
+    # Clients normally send the exact key, so try that before normalizing
+    return _PHILOSOPHER_KEYS.get(value) or _PHILOSOPHER_KEYS.get(value.strip().lower())
+
+def _static_json_response(body, etag):
+    """Serve a pre-serialized JSON payload, answering 304 when the client's ETag matches"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    # Like the static assets these only change on deploy, after which the ETag revalidates them
+    response.cache_control.public = True
+    response.cache_control.max_age = SETTINGS.static_max_age
+    return response.make_conditional(request)
+
+# Cache of recent chat payloads keyed by (philosopher, normalized message) so
+# repeated prompts - e.g. the suggested /api/topics - skip retrieval and generation
+_chat_cache = TTLCache(maxsize=2048, ttl=600)
+_chat_cache_lock = threading.Lock()
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Generations currently running per cache key; identical concurrent prompts wait
+# on the first one instead of each calling the backend
+_chat_inflight = {}
+INFLIGHT_WAIT_SECONDS = 60
+
+# Lookup tiers for /api/chat: (1) the exact cache above, which never embeds
+# anything; (2) this semantic cache, reusing the answer to a similar earlier
+# question from the same philosopher (e.g. "meaning of life?" vs "what is life's
+# meaning?"); (3) the chat system itself. A miss embeds the message once and the
+# vector is reused when the generated payload is stored.
+SEMANTIC_CACHE_ENABLED = SENTENCE_TRANSFORMERS_AVAILABLE and SETTINGS.semantic_cache
+_semantic_cache = SemanticCache(
+    threshold=SETTINGS.semantic_cache_threshold,
+    ttl=SETTINGS.semantic_cache_ttl
+) if SEMANTIC_CACHE_ENABLED else None
+
+# Largest accepted chat message, in UTF-8 bytes
+MAX_MESSAGE_BYTES = 4096
+# Largest accepted chat request body; bigger ones are refused before parsing
+MAX_BODY_BYTES = 8192
+
+def _loads(raw):
+    """Parse JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _read_chat_request():
+    """Return (data, None) for a JSON object body with a message, else (None, error response)"""
+    if request.content_length is not None and request.content_length > MAX_BODY_BYTES:
+        return None, _json({'error': 'Payload too large'}, 413)
+    # Bounded read, so a chunked body without Content-Length can't be buffered unchecked
+    raw = request.stream.read(MAX_BODY_BYTES + 1)
+    if len(raw) > MAX_BODY_BYTES:
+        return None, _json({'error': 'Payload too large'}, 413)
+    try:
+        data = _loads(raw)
+    except ValueError:  # orjson.JSONDecodeError is a ValueError too
+        return None, _json({'error': 'Invalid JSON'}, 400)
+    if not isinstance(data, dict) or not isinstance(data.get('message'), str):
+        return None, _json({'error': 'Message is required'}, 400)
+    return data, None
+
+def _chat_cache_key(philosopher, user_message):
+    """Build the response cache key for an already-stripped message"""
+    return (philosopher, _WHITESPACE_RE.sub(' ', user_message.lower()))
+
+def _cached_chat_payload(cache_key, produce):
+    """Return the cached payload for a key, coalescing concurrent misses into one produce() call"""
+    with _chat_cache_lock:
+        payload = _chat_cache.get(cache_key)
+        if payload is not None:
+            return payload
+        pending = _chat_inflight.get(cache_key)
+        is_leader = pending is None
+        if is_leader:
+            pending = _chat_inflight[cache_key] = threading.Event()
+    
+    if not is_leader:
+        pending.wait(INFLIGHT_WAIT_SECONDS)
+        with _chat_cache_lock:
+            payload = _chat_cache.get(cache_key)
+        # The first request failed or timed out - generate independently
+        return payload if payload is not None else produce()
+    
+    try:
+        payload = _semantic_cache_lookup(cache_key)
+        if payload is None:
+            payload = produce()
+            if _is_fallback(payload):
+                return payload
+            _semantic_cache_store(cache_key, payload)
+        with _chat_cache_lock:
+            _chat_cache[cache_key] = payload
+        return payload
+    finally:
+        with _chat_cache_lock:
+            _chat_inflight.pop(cache_key, None)
+        pending.set()
+
+def _is_fallback(payload):
+    """True for the stand-in answers given when generation failed - caching them would keep
+    serving a brief outage to repeated and similar questions"""
+    return payload['generated_by'].endswith('fallback')
+
+def _semantic_cache_lookup(cache_key):
+    """Return a payload generated for a similar message to the same philosopher, if any"""
+    if _semantic_cache is None:
+        return None
+    philosopher, message = cache_key
+    try:
+        payload = _semantic_cache.lookup(philosopher, message)
+    except Exception as e:
+        logger.warning("Semantic cache lookup failed: %s", e)
+        return None
+    if payload is None:
+        return None
+    return {**payload, 'generated_by': 'semantic_cache'}
+
+def _semantic_cache_store(cache_key, payload):
+    if _semantic_cache is None:
+        return
+    philosopher, message = cache_key
+    try:
+        _semantic_cache.store(philosopher, message, payload)
+    except Exception as e:
+        logger.warning("Semantic cache store failed: %s", e)
+
+def _has_server_history(conversation_id):
+    """True if the active chat system already holds context for this conversation"""
+    history = getattr(_get_chat_system(), 'conversation_history', None)
+    return history is not None and conversation_id in history
+
+# Server-side transcript for /api/conversation when REDIS_URL is set; otherwise a
+# short, truncated transcript rides along in the session cookie
+_conversation_log = create_conversation_log()
+
+# Transcript writes are not needed to answer the chat, so they run off the
+# response path (as a greenlet when gevent has patched threading). One worker
+# keeps each conversation's entries in order; every write is one round trip.
+_background_writes = ThreadPoolExecutor(max_workers=1, thread_name_prefix='chat-log')
+
+def _persist_exchange(conversation_id, entry):
+    try:
+        _conversation_log.append(conversation_id, entry)
+    except Exception as e:
+        logger.warning("Conversation log write failed: %s", e)
+
+def _log_exchange(conversation_id, user_message, philosopher, response):
+    """Record a chat exchange for /api/conversation"""
+    if _conversation_log is not None:
+        _background_writes.submit(_persist_exchange, conversation_id, {
+            'user': user_message,
+            'philosopher': philosopher,
+            'response': response
+        })
+        return
+    
+    # Store conversation in session (optimized)
+    optimize_session()
+    conversation = session.setdefault('conversation', [])
+    
+    # Only store essential data
+    conversation.append({
+        'user': user_message[:200],  # Truncate long messages
+        'philosopher': philosopher,
+        'response': response[:500] if len(response) > 500 else response  # Truncate long responses
+    })
+    
+    # Keep only last 5 conversations to prevent overflow, trimming in place instead of re-slicing
+    if len(conversation) > 5:
+        del conversation[:-5]
+    
+    # In-place edits aren't tracked, so flag the cookie for re-serialization
+    session.modified = True
+
 # Session management to prevent cookie overflow
 def optimize_session():
     """Optimize session to prevent cookie overflow"""
@@ -49,7 +406,8 @@ def optimize_session():
         # Keep only last 10 messages to prevent cookie overflow
         history = session['conversation_history']
         if len(history) > 10:
-            session['conversation_history'] = history[-10:]
+            del history[:-10]
+            session.modified = True
     
     # Clean up old sessions
     session.permanent = True
@@ -57,123 +415,166 @@ def optimize_session():
 # Initialize the best available chat system
 def get_chat_system():
     """Get the best available chat system with priority order"""
-    api_type = os.getenv('API_TYPE', 'groq').lower()
-    use_internet = os.getenv('USE_INTERNET_SEARCH', 'true').lower() == 'true'
-    
     # Priority 1: GROQ (free, fast, actually works!)
-    if api_type == 'groq' and GROQ_AVAILABLE:
-        logging.info("🚀 Using GROQ Chat Engine (FREE & FAST)")
-        return GroqPhilosopherChat()
+    if SETTINGS.api_type == 'groq' and GROQ_AVAILABLE:
+        logger.info("🚀 Using GROQ Chat Engine (FREE & FAST)")
+        # Shares the route's semantic cache rather than loading a second embedding model
+        return GroqPhilosopherChat(response_cache=_semantic_cache)
     
     # Priority 2: Internet RAG with fallbacks
-    elif INTERNET_RAG_AVAILABLE and use_internet:
-        logging.info("🌐 Using Internet RAG Engine")
+    elif INTERNET_RAG_AVAILABLE and SETTINGS.use_internet_search:
+        logger.info("🌐 Using Internet RAG Engine")
         return ModernPhilosopherChat()
     
     # Priority 3: AI Enhanced
     elif AI_ENHANCED_AVAILABLE:
-        logging.info("🤖 Using AI-Enhanced Chat")
+        logger.info("🤖 Using AI-Enhanced Chat")
         return AIPhilosopherChat()
     
     # Final fallback: Safe templates
     else:
-        logging.info("🛡️ Using Safe Template Chat")
+        logger.info("🛡️ Using Safe Template Chat")
         return SafePhilosopherChat()
 
-# Initialize chat system
-print("🤖 Initializing Philosophy Chat System...")
-chat_system = get_chat_system()
-print(f"✅ Chat system ready: {type(chat_system).__name__}")
+# The chat system is built on first use rather than at import, so reloads,
+# test collection and worker boot don't pay for engine initialization
+chat_system = None
+_chat_system_lock = threading.Lock()
+
+def _get_chat_system():
+    """Return the shared chat system, initializing it on first use"""
+    global chat_system
+    if chat_system is None:
+        with _chat_system_lock:
+            if chat_system is None:
+                logger.debug("🤖 Initializing Philosophy Chat System...")
+                chat_system = get_chat_system()
+                logger.info("✅ Chat system ready: %s", type(chat_system).__name__)
+    return chat_system
+
+def _init_chat():
+    """(Re)build the chat system for this process, e.g. from a Gunicorn post_fork hook"""
+    global chat_system, _chat_system_lock
+    # Drop anything inherited from a preloading parent, including a held lock
+    chat_system = None
+    _chat_system_lock = threading.Lock()
+    return _get_chat_system()
 
 @main.route('/')
 def index():
     """Main chat interface"""
     return render_template('index.html')
 
+def _bind_chat_dispatch(chat_system):
+    """Pick the generation method once per chat system: returns f(message, philosopher, conversation_id) -> (response, generated_by)"""
+    if hasattr(chat_system, 'chat_with_status'):
+        # GROQ system, which reports when every model failed and it answered from a template
+        def dispatch(message, philosopher, conversation_id):
+            response, generated = chat_system.chat_with_status(message, philosopher, fast_mode=False)
+            return response, 'groq_fast' if generated else 'groq_fallback'
+        return dispatch
+    
+    if hasattr(chat_system, 'chat'):
+        # Internet RAG system
+        generated_by = 'groq_fast' if GROQ_AVAILABLE else 'internet_rag'
+        generate = chat_system.chat
+        if 'fast_mode' in inspect.signature(generate).parameters:
+            generate = partial(generate, fast_mode=False)  # Enhanced mode for better responses
+        return lambda message, philosopher, conversation_id: (generate(message, philosopher), generated_by)
+    
+    if hasattr(chat_system, 'generate_response'):
+        # AI-Enhanced system alternative
+        def dispatch(message, philosopher, conversation_id):
+            result = chat_system.generate_response(
+                user_message=message,
+                philosopher=philosopher,
+                context=[],
+                conversation_id=conversation_id
+            )
+            generated_by = result.get('generated_by', '')
+            return result['message'], generated_by if generated_by.endswith('fallback') else 'ai_enhanced'
+        return dispatch
+    
+    # Safe template system
+    return lambda message, philosopher, conversation_id: (chat_system.get_response(message, philosopher), 'template')
+
+_chat_dispatch = (None, None)
+
+def _get_chat_dispatch():
+    """Return the active chat system with its bound dispatch, rebinding only when the system changes"""
+    global _chat_dispatch
+    chat_system = _get_chat_system()
+    bound_system, dispatch = _chat_dispatch
+    if bound_system is not chat_system:
+        dispatch = _bind_chat_dispatch(chat_system)
+        _chat_dispatch = (chat_system, dispatch)
+    return chat_system, dispatch
+
+def _generate_chat_payload(user_message, philosopher, conversation_id):
+    """Generate a chat response with the active system and build the API payload"""
+    chat_system, dispatch = _get_chat_dispatch()
+    response, generated_by = dispatch(user_message, philosopher, conversation_id)
+    
+    return {
+        'response': response,
+        'philosopher': philosopher,
+        'generated_by': generated_by,
+        'system_type': type(chat_system).__name__,
+        'internet_enabled': INTERNET_RAG_AVAILABLE and SETTINGS.use_internet_search,
+        'sources': []  # Will be populated by Internet RAG in future updates
+    }
+
 @main.route('/api/chat', methods=['POST'])
 def chat():
     """Handle chat messages with Internet RAG"""
+    user_message, philosopher = '', 'neutral'
     try:
-        data = request.get_json()
-        
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
+        data, error = _read_chat_request()
+        if error is not None:
+            return error
         
         user_message = data['message'].strip()
-        philosopher = data.get('philosopher', 'neutral').lower()
+        philosopher = _canonical_philosopher(data.get('philosopher'))
+        if philosopher is None:
+            return _json({'error': 'Unknown philosopher'}, 400)
         
         if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return _json({'error': 'Message cannot be empty'}, 400)
+        
+        if len(user_message.encode('utf-8')) > MAX_MESSAGE_BYTES:
+            return _json({'error': 'Message too long'}, 413)
         
         # Ensure session has a conversation ID
         if 'conversation_id' not in session:
-            session['conversation_id'] = str(uuid.uuid4())
-        
-        # Optimize session to prevent cookie overflow
-        optimize_session()
+            session['conversation_id'] = os.urandom(16).hex()
         
         # Log the interaction
-        logging.info(f"💭 User ({philosopher}): {user_message}")
+        logger.debug("💭 User (%s): %s", philosopher, user_message)
         
-        # Generate response using the best available system with fast mode
-        if hasattr(chat_system, 'chat'):
-            # Internet RAG or AI-Enhanced system - ENABLE FAST MODE FOR SPEED
-            response = chat_system.chat(user_message, philosopher, fast_mode=False)
-            generated_by = 'groq_fast' if GROQ_AVAILABLE else 'internet_rag'
-        elif hasattr(chat_system, 'generate_response'):
-            # AI-Enhanced system alternative
-            result = chat_system.generate_response(
-                user_message=user_message,
-                philosopher=philosopher,
-                context=[],
-                conversation_id=session['conversation_id']
-            )
-            response = result['message']
-            generated_by = 'ai_enhanced'
+        # Identical prompts without prior server-side context reuse a cached payload
+        conversation_id = session['conversation_id']
+        produce = partial(_generate_chat_payload, user_message, philosopher, conversation_id)
+        if _has_server_history(conversation_id):
+            payload = produce()
         else:
-            # Safe template system
-            response = chat_system.get_response(user_message, philosopher)
-            generated_by = 'template'
-        
-        # Store conversation in session (optimized)
-        if 'conversation' not in session:
-            session['conversation'] = []
-        
-        # Only store essential data
-        conversation_entry = {
-            'user': user_message[:200],  # Truncate long messages
-            'philosopher': philosopher,
-            'response': response[:500] if len(response) > 500 else response  # Truncate long responses
-        }
+            payload = _cached_chat_payload(_chat_cache_key(philosopher, user_message), produce)
+        response = payload['response']
         
-        session['conversation'].append(conversation_entry)
-        
-        # Keep only last 5 conversations to prevent overflow
-        if len(session['conversation']) > 5:
-            session['conversation'] = session['conversation'][-5:]
-        
-        session.modified = True
+        _log_exchange(conversation_id, user_message, philosopher, response)
         
         # Log the response
-        logging.info(f"🤖 {philosopher.title()}: {response[:100]}...")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🤖 %s: %s...", philosopher.title(), response[:100])
         
-        return jsonify({
-            'response': response,
-            'philosopher': philosopher,
-            'generated_by': generated_by,
-            'system_type': type(chat_system).__name__,
-            'internet_enabled': INTERNET_RAG_AVAILABLE and os.getenv('USE_INTERNET_SEARCH', 'true').lower() == 'true',
-            'sources': []  # Will be populated by Internet RAG in future updates
-        })
+        return _json(payload)
     
     except Exception as e:
-        error_msg = f"Error generating response: {str(e)}"
-        logging.error(error_msg)
+        logger.exception("Error generating response: %s", e)
         
         # Fallback response
         fallback_response = f"I apologize, but I'm experiencing some technical difficulties. Your question about '{user_message[:50]}...' is fascinating and deserves a thoughtful response. Please try again in a moment, or rephrase your question."
         
-        return jsonify({
+        return _json({
             'response': fallback_response,
             'philosopher': philosopher,
             'error': True,
@@ -181,249 +582,228 @@ def chat():
             'system_type': 'Fallback'
         })
 
+_stream_buffers = create_stream_buffers()
+
+_SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no',  # Don't let nginx hold back streamed chunks
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Expose-Headers': 'X-Stream-Id'
+}
+
+# Tokens are coalesced into one event per window - far fewer SSE frames for ~100ms of added latency
+STREAM_FLUSH_SECONDS = 0.1
+
+# Streams are generated off the request so a dropped client can resume. The pool caps how many
+# generate at once per worker (gthread workers would otherwise start a thread per stream);
+# beyond that, new streams queue until a slot frees.
+STREAM_WORKERS = int(os.getenv('STREAM_WORKERS', 32))
+_stream_workers = ThreadPoolExecutor(max_workers=STREAM_WORKERS, thread_name_prefix='chat-stream')
+
+def _fill_stream(buffer, parts, philosopher):
+    """Run the response generator to completion, recording each SSE event in the buffer"""
+    text = []
+    pending = []
+    
+    def flush():
+        buffer.append(json.dumps({
+            'type': 'content',
+            'delta': ''.join(pending),
+            'philosopher': philosopher
+        }))
+        pending.clear()
+    
+    try:
+        last_flush = time.monotonic()
+        for delta in parts:
+            text.append(delta)
+            pending.append(delta)
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_SECONDS:
+                flush()
+                last_flush = now
+    except Exception as e:
+        logger.exception("Streaming generation error: %s", e)
+        if not text:
+            text.append("I apologize, but I'm experiencing some technical difficulties. Please try again in a moment.")
+    finally:
+        if pending:
+            flush()
+        # Send completion signal with the full text
+        buffer.append(json.dumps({
+            'type': 'complete',
+            'text': ''.join(text),
+            'philosopher': philosopher
+        }))
+        buffer.finish()
+
+def _sse_response(buffer, stream_id, start):
+    """Stream buffered events from index `start`, each tagged with its id for Last-Event-ID resumes"""
+    def events():
+        for index, event in buffer.read_from(start):
+            yield f"id: {index}\ndata: {event}\n\n"
+    
+    return Response(
+        events(),
+        mimetype='text/event-stream',
+        headers={**_SSE_HEADERS, 'X-Stream-Id': stream_id}
+    )
+
 @main.route('/api/chat/stream', methods=['POST'])
 def chat_stream():
     """Stream chat responses for real-time typing effect"""
     try:
-        data = request.get_json()
+        data, error = _read_chat_request()
+        if error is not None:
+            return error
+        
         user_message = data['message'].strip()
-        philosopher = data.get('philosopher', 'neutral').lower()
+        philosopher = _canonical_philosopher(data.get('philosopher'))
+        if philosopher is None:
+            return _json({'error': 'Unknown philosopher'}, 400)
         
         if not user_message:
-            return jsonify({'error': 'Message cannot be empty'}), 400
+            return _json({'error': 'Message cannot be empty'}, 400)
+        
+        if len(user_message.encode('utf-8')) > MAX_MESSAGE_BYTES:
+            return _json({'error': 'Message too long'}, 413)
+        
+        chat_system, dispatch = _get_chat_dispatch()
         
-        # Generate full response first (supports all backend modes)
-        chat_system = get_chat_system()
-
         if 'conversation_id' not in session:
-            session['conversation_id'] = str(uuid.uuid4())
-
-        if hasattr(chat_system, 'chat'):
-            full_response = chat_system.chat(user_message, philosopher, fast_mode=False)  # Enhanced mode for better responses
-        elif hasattr(chat_system, 'generate_response'):
-            result = chat_system.generate_response(
-                user_message=user_message,
-                philosopher=philosopher,
-                context=[],
-                conversation_id=session['conversation_id']
-            )
-            full_response = result.get('message', "I apologize, but I couldn't generate a response.")
-        elif hasattr(chat_system, 'get_response'):
-            full_response = chat_system.get_response(user_message, philosopher)
-        else:
-            full_response = "I apologize, but streaming is temporarily unavailable."
+            session['conversation_id'] = os.urandom(16).hex()
+        conversation_id = session['conversation_id']
         
-        def generate_stream():
-            """Generate streaming response"""
-            words = full_response.split(' ')
-            current_text = ""
-            
-            for i, word in enumerate(words):
-                current_text += word
-                if i < len(words) - 1:
-                    current_text += " "
-                
-                # Create streaming chunk
-                chunk = {
-                    'type': 'content',
-                    'text': current_text,
-                    'word': word,
-                    'progress': (i + 1) / len(words),
-                    'philosopher': philosopher
-                }
-                
-                yield f"data: {json.dumps(chunk)}\n\n"
-                time.sleep(0.05)  # 50ms delay between words for natural typing
-            
-            # Send completion signal
-            final_chunk = {
-                'type': 'complete',
-                'text': full_response,
-                'philosopher': philosopher
-            }
-            yield f"data: {json.dumps(final_chunk)}\n\n"
+        def generate_response_parts():
+            """Yield the response as the backend produces it (a single part for non-streaming backends)"""
+            if hasattr(chat_system, 'chat_stream'):
+                stream = chat_system.chat_stream
+                # Backends that keep conversation history record the streamed turn under this id
+                if 'conversation_id' in inspect.signature(stream).parameters:
+                    stream = partial(stream, conversation_id=conversation_id)
+                yield from stream(user_message, philosopher)
+            else:
+                yield dispatch(user_message, philosopher, conversation_id)[0]
         
-        return Response(
-            generate_stream(),
-            mimetype='text/event-stream',
-            headers={
-                'Cache-Control': 'no-cache',
-                'Connection': 'keep-alive',
-                'Access-Control-Allow-Origin': '*'
-            }
-        )
+        stream_id = os.urandom(16).hex()
+        buffer = _stream_buffers.create(stream_id)
+        # Generate independently of this response so a dropped client can resume
+        _stream_workers.submit(_fill_stream, buffer, generate_response_parts(), philosopher)
+        
+        return _sse_response(buffer, stream_id, 0)
     
     except Exception as e:
-        logging.error(f"Streaming error: {str(e)}")
-        return jsonify({'error': 'Streaming failed'}), 500
+        logger.exception("Streaming error: %s", e)
+        return _json({'error': 'Streaming failed'}, 500)
+
+@main.route('/api/chat/stream/<stream_id>')
+def resume_chat_stream(stream_id):
+    """Replay a stream after the client's Last-Event-ID, then follow it live until complete"""
+    buffer = _stream_buffers.get(stream_id)
+    if buffer is None:
+        return _json({'error': 'Stream not found'}, 404)
+    
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id', '-1'))
+    try:
+        start = int(last_event_id) + 1
+    except ValueError:
+        return _json({'error': 'Invalid Last-Event-ID'}, 400)
+    
+    return _sse_response(buffer, stream_id, max(start, 0))
 
 @main.route('/api/philosophers')
 def get_philosophers():
     """Get available philosophers"""
-    philosophers = {
-        'camus': {
-            'name': 'Albert Camus',
-            'description': 'French philosopher known for absurdism and existentialism',
-            'period': '1913-1960',
-            'specialties': ['Absurdism', 'Revolt', 'The Stranger'],
-            'key_concepts': ['Absurdism', 'Revolt', 'The Stranger']
-        },
-        'nietzsche': {
-            'name': 'Friedrich Nietzsche', 
-            'description': 'German philosopher who declared "God is dead"',
-            'period': '1844-1900',
-            'specialties': ['Will to Power', 'Übermensch', 'Eternal Recurrence'],
-            'key_concepts': ['Will to Power', 'Übermensch', 'Eternal Recurrence']
-        },
-        'dostoevsky': {
-            'name': 'Fyodor Dostoevsky',
-            'description': 'Russian novelist and philosopher exploring human psychology',
-            'period': '1821-1881',
-            'specialties': ['Free will', 'Suffering', 'Faith vs. Reason'],
-            'key_concepts': ['Free will', 'Suffering', 'Faith vs. Reason']
-        },
-        'sartre': {
-            'name': 'Jean-Paul Sartre',
-            'description': 'Existentialist philosopher of freedom and responsibility', 
-            'period': '1905-1980',
-            'specialties': ['Existentialism', 'Freedom', 'Bad Faith'],
-            'key_concepts': ['Existentialism', 'Freedom', 'Bad Faith']
-        },
-        'beauvoir': {
-            'name': 'Simone de Beauvoir',
-            'description': 'Existential feminist exploring ethics and oppression',
-            'period': '1908-1986',
-            'specialties': ['Existential Feminism', 'Ethics of Ambiguity', 'Gender'],
-            'key_concepts': ['Existential Feminism', 'Ethics of Ambiguity', 'Gender']
-        },
-        'kant': {
-            'name': 'Immanuel Kant',
-            'description': 'Critical philosopher of reason and moral duty',
-            'period': '1724-1804',
-            'specialties': ['Categorical Imperative', 'Critical Philosophy', 'Ethics'],
-            'key_concepts': ['Categorical Imperative', 'Critical Philosophy', 'Ethics']
-        },
-        'aristotle': {
-            'name': 'Aristotle',
-            'description': 'Ancient philosopher of virtue ethics and practical wisdom',
-            'period': '384-322 BCE',
-            'specialties': ['Virtue Ethics', 'Practical Wisdom', 'Human Flourishing'],
-            'key_concepts': ['Virtue Ethics', 'Practical Wisdom', 'Human Flourishing']
-        },
-        'socrates': {
-            'name': 'Socrates',
-            'description': 'Classical Greek philosopher, father of Western philosophy and the Socratic method',
-            'period': '470-399 BCE',
-            'specialties': ['Socratic Method', 'Self-Knowledge', 'Virtue Ethics'],
-            'key_concepts': ['Know Thyself', 'Unexamined Life', 'Virtue is Knowledge', 'Socratic Irony']
-        },
-        'marcus': {
-            'name': 'Marcus Aurelius',
-            'description': 'Stoic emperor-philosopher emphasizing virtue and acceptance',
-            'period': '121-180 CE',
-            'specialties': ['Stoicism', 'Virtue', 'Inner Peace'],
-            'key_concepts': ['Stoicism', 'Virtue', 'Inner Peace']
-        },
-        'kafka': {
-            'name': 'Franz Kafka',
-            'description': 'Czech writer exploring existential anxiety, alienation, and bureaucratic absurdity',
-            'period': '1883-1924',
-            'specialties': ['Existential Anxiety', 'Alienation', 'Absurdity', 'Bureaucracy'],
-            'key_concepts': ['The Absurd', 'Metamorphosis', 'Guilt', 'Isolation', 'Kafkaesque']
-        },
-        'cioran': {
-            'name': 'Emil Cioran',
-            'description': 'Romanian-French philosopher known for his pessimistic insights and aphoristic style',
-            'period': '1911-1995',
-            'specialties': ['Pessimism', 'Aphorisms', 'Despair', 'Insomnia'],
-            'key_concepts': ['The Trouble with Being Born', 'Lucidity', 'Nihilism', 'Sleeplessness']
-        },
-        'neutral': {
-            'name': 'Philosophy Guide',
-            'description': 'Neutral philosophical discussion without specific persona',
-            'period': 'Modern',
-            'specialties': ['General Philosophy', 'Critical Thinking', 'Ethics'],
-            'key_concepts': ['General Philosophy', 'Critical Thinking', 'Ethics']
-        }
-    }
-    
-    return jsonify(philosophers)
+    return _static_json_response(_PHILOSOPHERS_JSON, _PHILOSOPHERS_ETAG)
 
 @main.route('/api/topics')
 def get_topics():
     """Get suggested philosophical topics with modern themes"""
-    topics = [
-        "What is the meaning of life in the digital age?",
-        "Do we have free will in a deterministic universe?",
-        "Is existence absurd? How do we find purpose?",
-        "What is consciousness? Are we more than our neurons?",
-        "How should we live ethically in modern society?",
-        "What is truth in an era of information overload?",
-        "How do we find meaning after traditional beliefs?",
-        "What is justice in an unequal world?",
-        "Is suffering necessary for growth and wisdom?",
-        "How do we stay human in an AI-dominated future?",
-        "What are our obligations to future generations?",
-        "How do we balance individual freedom with social responsibility?",
-        "What does it mean to live authentically today?",
-        "How do we cope with existential anxiety?",
-        "What is the role of technology in human flourishing?"
-    ]
-    return jsonify(topics)
+    return _static_json_response(_TOPICS_JSON, _TOPICS_ETAG)
 
 @main.route('/api/conversation')
 def get_conversation():
     """Get conversation history"""
+    if _conversation_log is not None:
+        conversation_id = session.get('conversation_id')
+        return _json(_conversation_log.get(conversation_id) if conversation_id else [])
     conversation = session.get('conversation', [])
-    return jsonify(conversation)
+    return _json(conversation)
 
 @main.route('/api/clear_conversation', methods=['POST']) 
 def clear_conversation():
     """Clear the current conversation"""
     if 'conversation_id' in session:
-        session.pop('conversation_id')
+        conversation_id = session.pop('conversation_id')
+        if _conversation_log is not None:
+            _conversation_log.clear(conversation_id)
     if 'conversation' in session:
         session.pop('conversation')
     session.modified = True
-    return jsonify({'status': 'cleared'})
+    return _json({'status': 'cleared'})
+
+@main.route('/api/warmup', methods=['GET', 'POST'])
+def warmup():
+    """Initialize the chat system ahead of the first chat (e.g. right after a worker starts)"""
+    return _json({'status': 'ready', 'system_type': type(_get_chat_system()).__name__})
+
+# Serialized status and its ETag, for the chat system it describes
+_status_payload = (None, None, None)
+
+def _status_json():
+    """Return (body, etag) for /api/status, serializing only when the chat system changes"""
+    global _status_payload
+    chat_system = _get_chat_system()
+    described_system, body, etag = _status_payload
+    if described_system is not chat_system:
+        body = _dumps({
+            'internet_rag_available': INTERNET_RAG_AVAILABLE,
+            'ai_enhanced_available': AI_ENHANCED_AVAILABLE,
+            'current_system': type(chat_system).__name__,
+            'internet_search_enabled': SETTINGS.use_internet_search,
+            'features': {
+                'real_time_search': INTERNET_RAG_AVAILABLE,
+                'reddit_integration': INTERNET_RAG_AVAILABLE,
+                'academic_sources': INTERNET_RAG_AVAILABLE,
+                'current_events': INTERNET_RAG_AVAILABLE,
+                'ai_generation': AI_ENHANCED_AVAILABLE or INTERNET_RAG_AVAILABLE,
+                'template_fallback': True,
+                'tts_available': EDGE_TTS_AVAILABLE
+            },
+            'model_info': {
+                'primary_model': SETTINGS.primary_model,
+                'fallback_model': SETTINGS.fallback_model,
+                'search_enabled': SETTINGS.use_internet_search
+            }
+        })
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        _status_payload = (chat_system, body, etag)
+    return body, etag
 
 @main.route('/api/status')
 def system_status():
     """Get system status and capabilities"""
-    return jsonify({
-        'internet_rag_available': INTERNET_RAG_AVAILABLE,
-        'ai_enhanced_available': AI_ENHANCED_AVAILABLE,
-        'current_system': type(chat_system).__name__,
-        'internet_search_enabled': os.getenv('USE_INTERNET_SEARCH', 'true').lower() == 'true',
-        'features': {
-            'real_time_search': INTERNET_RAG_AVAILABLE,
-            'reddit_integration': INTERNET_RAG_AVAILABLE,
-            'academic_sources': INTERNET_RAG_AVAILABLE,
-            'current_events': INTERNET_RAG_AVAILABLE,
-            'ai_generation': AI_ENHANCED_AVAILABLE or INTERNET_RAG_AVAILABLE,
-            'template_fallback': True,
-            'tts_available': EDGE_TTS_AVAILABLE
-        },
-        'model_info': {
-            'primary_model': os.getenv('PRIMARY_MODEL', 'meta-llama/Llama-2-70b-chat-hf'),
-            'fallback_model': os.getenv('FALLBACK_MODEL', 'microsoft/DialoGPT-large'),
-            'search_enabled': os.getenv('USE_INTERNET_SEARCH', 'true').lower() == 'true'
-        }
-    })
+    body, etag = _status_json()
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    # Fixed per worker, but may differ between deploys or workers - keep the fresh window short
+    response.headers['Cache-Control'] = 'public, max-age=60, stale-while-revalidate=600'
+    return response.make_conditional(request)
 
 
 @main.route('/api/tts', methods=['POST'])
 def text_to_speech():
     """Convert chat text to speech using a single deep male voice."""
     if not EDGE_TTS_AVAILABLE:
-        return jsonify({'error': 'TTS dependency not installed. Install edge-tts.'}), 503
+        return _json({'error': 'TTS dependency not installed. Install edge-tts.'}, 503)
 
     try:
         data = request.get_json() or {}
         text = (data.get('text') or '').strip()
 
         if not text:
-            return jsonify({'error': 'Text is required'}), 400
+            return _json({'error': 'Text is required'}, 400)
 
         # Keep latency manageable and avoid oversized payloads.
         max_chars = 2500
@@ -446,7 +826,7 @@ def text_to_speech():
 
         audio_data = asyncio.run(asyncio.wait_for(synthesize_audio(text), timeout=45))
         if not audio_data:
-            return jsonify({'error': 'Failed to generate audio'}), 500
+            return _json({'error': 'Failed to generate audio'}, 500)
 
         return Response(
             BytesIO(audio_data).getvalue(),
@@ -455,5 +835,5 @@ def text_to_speech():
         )
 
     except Exception as e:
-        logging.error(f"TTS error: {str(e)}")
-        return jsonify({'error': 'TTS generation failed'}), 500
+        logger.exception("TTS error: %s", e)
+        return _json({'error': 'TTS generation failed'}, 500)
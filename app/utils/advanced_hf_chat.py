@@ -7,14 +7,51 @@ Uses multiple HF models for reliable conversational AI generation
 import os
 import requests
 import json
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import logging
+import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Iterator, Optional
+from dataclasses import dataclass, field
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from app.utils.http_client import new_http_session
 from app.utils.internet_rag_engine import InternetRAGEngine
+from app.utils.semantic_cache import SemanticCache, SENTENCE_TRANSFORMERS_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+def _loads(raw):
+    """Parse JSON text or bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Models are nudged to load at most this often, in the background while the search runs
+WARMUP_INTERVAL_SECONDS = 300
+_warmup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='hf-warmup')
+
+# Cap on concurrent inference requests across all chats in this process, so the
+# per-chat model race can't multiply into a rate-limit storm under load
+HF_MAX_INFLIGHT = int(os.getenv('HF_MAX_INFLIGHT', 16))
+_inflight = threading.BoundedSemaphore(HF_MAX_INFLIGHT)
+# Model queries run here; every query holds an in-flight slot, so more threads would only wait
+_model_pool = ThreadPoolExecutor(max_workers=HF_MAX_INFLIGHT, thread_name_prefix='hf-model')
 
 @dataclass
 class ModelConfig:
@@ -23,6 +60,57 @@ class ModelConfig:
     max_tokens: int
     temperature: float
     style: str
+    # Streamed chunks grow from min_batch_size tokens by growth_factor up to
+    # max_batch_size: the first token goes out at once, later ones in fewer writes
+    min_batch_size: int = 1
+    max_batch_size: int = 50
+    growth_factor: float = 3.0
+    # Whether the model repeats the prompt at the start of its output despite return_full_text=False
+    echoes_prompt: bool = False
+    # Greedy decoding: identical prompts give identical output, so the server can reuse
+    # its prefix cache for the persona header and repeated questions
+    deterministic: bool = False
+    # Generation parameters sent with every request, built once
+    parameters: Dict[str, Any] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        if self.deterministic:
+            # TGI rejects temperature 0, and greedy decoding ignores temperature anyway
+            self.parameters = {
+                "max_new_tokens": self.max_tokens,
+                "do_sample": False,
+                "return_full_text": False
+            }
+        else:
+            self.parameters = {
+                "max_new_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "do_sample": True,
+                "return_full_text": False
+            }
+
+@dataclass(frozen=True)
+class Persona:
+    name: str
+    style: str
+    traits: str
+    concepts: str
+    # The persona parts of the prompt never change, so they are built once
+    header: str = field(init=False, repr=False)
+    footer: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'header', f"""You are {self.name}, the renowned philosopher. 
+
+Your philosophical style: {self.style}
+Your speaking traits: {self.traits}
+Your key concepts: {self.concepts}
+
+Current internet discussions about this topic:
+""")
+        object.__setattr__(self, 'footer', f"""Respond as {self.name} would, incorporating both your philosophical framework and insights from the current discussions. Be conversational, engaging, and authentic to your philosophical style.
+
+{self.name} responds:""")
 
 class HuggingFacePhilosopherChat:
     """
@@ -30,18 +118,45 @@ class HuggingFacePhilosopherChat:
     Multiple model fallbacks for reliability
     """
     
-    def __init__(self):
+    # Markers after which a model starts writing the next turn itself
+    _DELIMITERS = ('\n\nHuman:', '\n\nUser:', '###', 'Question:')
+    _MAX_DELIMITER_LEN = max(len(d) for d in _DELIMITERS)
+    _DELIMITER_RE = re.compile('|'.join(map(re.escape, _DELIMITERS)))
+    # Weight of the newest sample in each model's latency average
+    STATS_ALPHA = 0.2
+    # How long a model may go without answering before the next-ranked one is also tried
+    HEDGE_DELAY_SECONDS = 3.0
+    
+    def __init__(
+        self,
+        http_session: Optional[requests.Session] = None,
+        response_cache: Optional[SemanticCache] = None
+    ):
         self.search_engine = InternetRAGEngine()
+        # Own keep-alive pool, reused across every model in the fallback chain and every chat.
+        # It carries the API key as a default header, so it must not be shared with other hosts.
+        self.http = http_session or new_http_session()
+        # Near-duplicate questions to the same persona skip both the search and the generation
+        if response_cache is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+            response_cache = SemanticCache(threshold=0.95)
+        self.response_cache = response_cache
+        self._warmed_at: Dict[str, float] = {}
         self.api_key = os.getenv('HUGGINGFACE_API_KEY')
         if not self.api_key:
             raise ValueError("HUGGINGFACE_API_KEY not found in environment")
             
         self.setup_models()
         self.setup_personas()
+        self.http.headers.update(self.headers)
+        
+        # Rolling per-model outcomes, used to try the most dependable model first
+        self._stats_lock = threading.Lock()
+        self.stats = {model.name: {'ok': 0, 'fail': 0, 'ewma_ms': 1000.0} for model in self.models}
         
     def setup_models(self):
         """Setup multiple HF models with fallbacks"""
         base_url = "https://api-inference.huggingface.co/models"
+        deterministic = os.getenv('HF_DETERMINISTIC', 'false').lower() == 'true'
         
         self.models = [
             # Primary models - larger and more capable
@@ -50,21 +165,25 @@ class HuggingFacePhilosopherChat:
                 url=f"{base_url}/microsoft/DialoGPT-large",
                 max_tokens=500,
                 temperature=0.7,
-                style="conversational"
+                style="conversational",
+                echoes_prompt=True,
+                deterministic=deterministic
             ),
             ModelConfig(
                 name="mistralai/Mistral-7B-Instruct-v0.1",
                 url=f"{base_url}/mistralai/Mistral-7B-Instruct-v0.1",
                 max_tokens=800,
                 temperature=0.6,
-                style="instruction-following"
+                style="instruction-following",
+                deterministic=deterministic
             ),
             ModelConfig(
                 name="google/flan-t5-large",
                 url=f"{base_url}/google/flan-t5-large",
                 max_tokens=400,
                 temperature=0.8,
-                style="text-generation"
+                style="text-generation",
+                deterministic=deterministic
             ),
             # Backup models
             ModelConfig(
@@ -72,7 +191,9 @@ class HuggingFacePhilosopherChat:
                 url=f"{base_url}/facebook/blenderbot-400M-distill",
                 max_tokens=300,
                 temperature=0.7,
-                style="conversational"
+                style="conversational",
+                echoes_prompt=True,
+                deterministic=deterministic
             )
         ]
         
@@ -84,24 +205,24 @@ class HuggingFacePhilosopherChat:
     def setup_personas(self):
         """Define philosopher personalities"""
         self.personas = {
-            'camus': {
-                'name': 'Albert Camus',
-                'style': 'existentialist and absurdist',
-                'traits': 'direct, passionate, uses metaphors',
-                'concepts': 'absurd, rebellion, authenticity, freedom'
-            },
-            'nietzsche': {
-                'name': 'Friedrich Nietzsche',
-                'style': 'bold and provocative',
-                'traits': 'dramatic, challenging, aphoristic',
-                'concepts': 'will to power, eternal recurrence, übermensch'
-            },
-            'dostoevsky': {
-                'name': 'Fyodor Dostoevsky',
-                'style': 'psychologically deep',
-                'traits': 'moral complexity, spiritual insight',
-                'concepts': 'suffering, redemption, free will, faith'
-            }
+            'camus': Persona(
+                name='Albert Camus',
+                style='existentialist and absurdist',
+                traits='direct, passionate, uses metaphors',
+                concepts='absurd, rebellion, authenticity, freedom'
+            ),
+            'nietzsche': Persona(
+                name='Friedrich Nietzsche',
+                style='bold and provocative',
+                traits='dramatic, challenging, aphoristic',
+                concepts='will to power, eternal recurrence, übermensch'
+            ),
+            'dostoevsky': Persona(
+                name='Fyodor Dostoevsky',
+                style='psychologically deep',
+                traits='moral complexity, spiritual insight',
+                concepts='suffering, redemption, free will, faith'
+            )
         }
     
     def create_philosophical_prompt(self, question: str, persona_name: str, context: List[Dict]) -> str:
@@ -111,20 +232,11 @@ class HuggingFacePhilosopherChat:
         # Format internet context
         context_text = self._format_context(context)
         
-        prompt = f"""You are {persona['name']}, the renowned philosopher. 
-
-Your philosophical style: {persona['style']}
-Your speaking traits: {persona['traits']}
-Your key concepts: {persona['concepts']}
-
-Current internet discussions about this topic:
-{context_text}
+        prompt = f"""{persona.header}{context_text}
 
 Human asks: "{question}"
 
-Respond as {persona['name']} would, incorporating both your philosophical framework and insights from the current discussions. Be conversational, engaging, and authentic to your philosophical style.
-
-{persona['name']} responds:"""
+{persona.footer}"""
 
         return prompt
     
@@ -133,38 +245,28 @@ Respond as {persona['name']} would, incorporating both your philosophical framew
         if not sources:
             return "No current internet context available."
             
-        context_parts = []
-        for i, source in enumerate(sources[:3], 1):  # Use top 3 sources
-            title = source.get('title', 'Unknown')[:60]
-            content = source.get('content', '')[:150]
-            
-            context_parts.append(f"{i}. {title}: {content}...")
-            
-        return "\n".join(context_parts)
+        # Use top 3 sources
+        return "\n".join(
+            f"{i}. {source.get('title', 'Unknown')[:60]}: {source.get('content', '')[:150]}..."
+            for i, source in enumerate(sources[:3], 1)
+        )
     
     def query_huggingface_model(self, model: ModelConfig, prompt: str) -> Optional[str]:
         """Query a specific HF model with error handling"""
+        started = time.monotonic()
         try:
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": model.max_tokens,
-                    "temperature": model.temperature,
-                    "do_sample": True,
-                    "return_full_text": False
-                }
-            }
+            payload = {"inputs": prompt, "parameters": model.parameters}
             
-            print(f"🤖 Trying {model.name}...")
-            response = requests.post(
-                model.url, 
-                headers=self.headers, 
-                json=payload,
-                timeout=30
-            )
+            logger.debug("Trying %s", model.name)
+            with _inflight:
+                response = self.http.post(
+                    model.url, 
+                    data=_dumps(payload),
+                    timeout=(3.05, 30)  # Fail fast on connect, allow for slow generation
+                )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 
                 # Handle different response formats
                 if isinstance(result, list) and len(result) > 0:
@@ -178,63 +280,251 @@ Respond as {persona['name']} would, incorporating both your philosophical framew
                     text = str(result)
                 
                 # Clean up the response
-                text = self._clean_response(text, prompt)
+                text = self._clean_response(text, prompt, model)
                 if len(text) > 50:  # Valid response
-                    print(f"✅ Success with {model.name}")
+                    logger.debug("Success with %s", model.name)
+                    self._record_result(model, True, started)
                     return text
                     
             elif response.status_code == 503:
-                print(f"⏳ {model.name} is loading, trying next model...")
+                logger.warning("%s is loading, trying next model", model.name)
             else:
-                print(f"❌ {model.name} failed: {response.status_code}")
+                logger.warning("%s failed: %s", model.name, response.status_code)
                 
         except Exception as e:
-            print(f"❌ Error with {model.name}: {e}")
+            logger.warning("Error with %s: %s", model.name, e)
             
+        self._record_result(model, False, started)
         return None
     
-    def _clean_response(self, text: str, original_prompt: str) -> str:
-        """Clean and format the model response"""
-        # Remove the original prompt if it's repeated
-        if original_prompt in text:
-            text = text.replace(original_prompt, "").strip()
+    def _record_result(self, model: ModelConfig, ok: bool, started: float):
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._stats_lock:
+            stats = self.stats[model.name]
+            stats['ok' if ok else 'fail'] += 1
+            stats['ewma_ms'] += self.STATS_ALPHA * (elapsed_ms - stats['ewma_ms'])
+    
+    def _ranked_models(self) -> List[ModelConfig]:
+        """Models ordered by expected latency per success; untried models keep their configured order"""
+        def expected_cost(model: ModelConfig) -> float:
+            stats = self.stats[model.name]
+            attempts = stats['ok'] + stats['fail']
+            success_rate = stats['ok'] / attempts if attempts else 1.0
+            return stats['ewma_ms'] / max(0.05, success_rate)
         
-        # Remove common artifacts
-        text = text.strip()
+        with self._stats_lock:
+            return sorted(self.models, key=expected_cost)
+    
+    def stream_huggingface_model(self, model: ModelConfig, prompt: str) -> Iterator[str]:
+        """Yield a model's response as it is generated (TGI server-sent events).
+        Yields nothing if the model is unavailable, so the caller can try the next one."""
+        payload = {"inputs": prompt, "parameters": model.parameters, "stream": True}
         
-        # Split by common delimiters and take the first substantial part
-        for delimiter in ['\n\nHuman:', '\n\nUser:', '###', 'Question:']:
-            if delimiter in text:
-                text = text.split(delimiter)[0].strip()
+        logger.debug("Streaming %s", model.name)
+        with _inflight, self.http.post(
+            model.url,
+            data=_dumps(payload),
+            headers={'Accept': 'text/event-stream'},
+            stream=True,
+            timeout=(3.05, 30)
+        ) as response:
+            if response.status_code == 503:
+                logger.warning("%s is loading, trying next model", model.name)
+                return
+            if response.status_code != 200:
+                logger.warning("%s failed: %s", model.name, response.status_code)
+                return
+            
+            text = ""
+            emitted = 0
+            batch_size = model.min_batch_size
+            batched = 0
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                token = _loads(line[5:]).get('token') or {}
+                if token.get('special'):
+                    continue
+                text += token.get('text', '')
+                batched += 1
+                if not emitted:
+                    text = text.lstrip()
+                
+                # Stop where the model starts a new turn, as _clean_response does
+                cut = self._DELIMITER_RE.search(text, max(0, emitted - self._MAX_DELIMITER_LEN))
+                if cut:
+                    text = text[:cut.start()]
+                    break
+                
+                # Hold back a tail that could still become the start of a delimiter
+                safe = len(text) - self._MAX_DELIMITER_LEN + 1
+                if batched >= batch_size and safe > emitted:
+                    yield text[emitted:safe]
+                    emitted = safe
+                    batched = 0
+                    batch_size = min(int(batch_size * model.growth_factor), model.max_batch_size)
+            
+            tail = text[emitted:].rstrip()
+            if tail:
+                yield tail
+    
+    def _warm_up_models(self):
+        """Send each model a one-token request in the background so a cold model is
+        already loading (instead of answering 503) by the time the real prompt arrives"""
+        now = time.monotonic()
+        for model in self.models:
+            last = self._warmed_at.get(model.name)
+            if last is None or now - last >= WARMUP_INTERVAL_SECONDS:
+                self._warmed_at[model.name] = now
+                _warmup_pool.submit(self._ping_model, model)
+    
+    def _ping_model(self, model: ModelConfig):
+        # Only a hint: skip it rather than queue behind real queries
+        if not _inflight.acquire(blocking=False):
+            return
+        try:
+            self.http.post(
+                model.url,
+                json={"inputs": "Hello", "parameters": {"max_new_tokens": 1}},
+                timeout=(3.05, 10)
+            )
+        except Exception:
+            pass  # The real query reports failures
+        finally:
+            _inflight.release()
+    
+    def _query_fastest_model(self, prompt: str) -> Optional[str]:
+        """Query models in _ranked_models() order and return the first valid response. The next
+        model starts as soon as one fails (e.g. 503 while loading) or after HEDGE_DELAY_SECONDS
+        without an answer, so a slow model doesn't hold up the chain but a healthy one answers alone."""
+        models = self._ranked_models()
+        launched = 0
+        pending = set()
+        try:
+            while True:
+                if launched < len(models):
+                    pending.add(_model_pool.submit(self.query_huggingface_model, models[launched], prompt))
+                    launched += 1
+                if not pending:
+                    return None
+                done, pending = wait(
+                    pending,
+                    timeout=self.HEDGE_DELAY_SECONDS if launched < len(models) else None,
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    response = future.result()
+                    if response:
+                        return response
+        finally:
+            # Queries already sent can't be recalled, but queued ones needn't start
+            for future in pending:
+                future.cancel()
+    
+    def _clean_response(self, text: str, original_prompt: str, model: ModelConfig) -> str:
+        """Clean and format the model response"""
+        # Remove the original prompt if it's echoed (always at the head, and only by some models)
+        if model.echoes_prompt and text.startswith(original_prompt):
+            text = text[len(original_prompt):]
         
-        return text
+        # Keep only what comes before the first common delimiter, in one pass
+        return self._DELIMITER_RE.split(text.strip(), maxsplit=1)[0].strip()
     
     def chat(self, question: str, persona: str = 'camus') -> str:
         """Generate philosophical response using HF models with internet context"""
         try:
-            # Step 1: Get internet context
-            print(f"🔍 Searching internet for: {question}")
+            cached = self._cached_response(question, persona)
+            if cached:
+                return cached
+            
+            # Step 1: Get internet context, while cold models start loading
+            self._warm_up_models()
+            logger.debug("Searching internet")
             internet_sources = self.search_engine.search_philosophy_content(question)
-            print(f"✅ Found {len(internet_sources)} sources")
+            logger.debug("Found %d sources", len(internet_sources))
             
             # Step 2: Create sophisticated prompt
             prompt = self.create_philosophical_prompt(question, persona, internet_sources)
             
-            # Step 3: Try models in order until one works
-            for model in self.models:
-                response = self.query_huggingface_model(model, prompt)
-                if response:
-                    return response
-                time.sleep(1)  # Brief pause between attempts
+            # Step 3: Try models from most to least dependable, hedging slow ones
+            response = self._query_fastest_model(prompt)
+            if response:
+                self._cache_response(question, persona, response)
+                return response
             
             # If all models fail, use enhanced fallback
-            print("⚠️ All HF models failed, using enhanced fallback")
+            logger.warning("All HF models failed, using enhanced fallback")
             return self._create_enhanced_fallback(question, persona, internet_sources)
             
         except Exception as e:
-            print(f"❌ Complete system failure: {e}")
+            logger.warning("Complete system failure: %s", e)
             return self._create_basic_fallback(question, persona)
     
+    def chat_many(self, questions: List[str], persona: str = 'camus', max_concurrency: int = 4) -> List[str]:
+        """Answer several questions, keeping up to max_concurrency chats in flight; results keep input order"""
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='hf-chat') as pool:
+            return list(pool.map(lambda question: self.chat(question, persona), questions))
+    
+    def chat_stream(self, question: str, persona: str = 'camus') -> Iterator[str]:
+        """Stream a philosophical response, yielding text as the model generates it"""
+        try:
+            cached = self._cached_response(question, persona)
+            if cached:
+                yield cached
+                return
+            
+            self._warm_up_models()
+            logger.debug("Searching internet")
+            internet_sources = self.search_engine.search_philosophy_content(question)
+            logger.debug("Found %d sources", len(internet_sources))
+            
+            prompt = self.create_philosophical_prompt(question, persona, internet_sources)
+        except Exception as e:
+            logger.warning("Complete system failure: %s", e)
+            yield self._create_basic_fallback(question, persona)
+            return
+        
+        # Try the most dependable model first; once one has started answering, stick with it
+        for model in self._ranked_models():
+            parts = []
+            started = time.monotonic()
+            try:
+                for delta in self.stream_huggingface_model(model, prompt):
+                    if not parts:
+                        self._record_result(model, True, started)  # Time to first text
+                    parts.append(delta)
+                    yield delta
+            except Exception as e:
+                logger.warning("Error with %s: %s", model.name, e)
+                if parts:
+                    return  # Don't cache an answer cut off mid-stream
+            if not parts:
+                self._record_result(model, False, started)
+            else:
+                logger.debug("Success with %s", model.name)
+                self._cache_response(question, persona, "".join(parts))
+                return
+        
+        logger.warning("All HF models failed, using enhanced fallback")
+        yield self._create_enhanced_fallback(question, persona, internet_sources)
+    
+    def _cache_namespace(self, persona: str) -> str:
+        # Unknown personas are answered as Camus, so they share Camus' cached answers
+        return persona if persona in self.personas else 'camus'
+    
+    def _cached_response(self, question: str, persona: str) -> Optional[str]:
+        """Return a stored answer to a near-identical question for this persona, if any"""
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.lookup(self._cache_namespace(persona), question)
+        if cached:
+            logger.debug("Semantic cache hit")
+        return cached
+    
+    def _cache_response(self, question: str, persona: str, response: str):
+        if self.response_cache is not None:
+            self.response_cache.store(self._cache_namespace(persona), question, response)
+    
     def _create_enhanced_fallback(self, question: str, persona: str, sources: List[Dict]) -> str:
         """Create intelligent fallback using internet content"""
         persona_info = self.personas.get(persona, self.personas['camus'])
@@ -243,13 +533,13 @@ Respond as {persona['name']} would, incorporating both your philosophical framew
         if sources:
             key_content = sources[0].get('content', '')[:200]
             
-            response = f"""As {persona_info['name']}, I find your question about "{question}" deeply relevant to our current times.
+            response = f"""As {persona_info.name}, I find your question about "{question}" deeply relevant to our current times.
 
 From what I observe in contemporary discussions: {key_content}...
 
-Through the lens of my {persona_info['style']} philosophy, particularly my focus on {persona_info['concepts']}, I would say:
+Through the lens of my {persona_info.style} philosophy, particularly my focus on {persona_info.concepts}, I would say:
 
-This question touches the very core of human existence. {persona_info['traits']} - we must examine not just the surface, but the fundamental implications for how we live authentically.
+This question touches the very core of human existence. {persona_info.traits} - we must examine not just the surface, but the fundamental implications for how we live authentically.
 
 What strikes me most is how this modern concern echoes the eternal questions I've always explored. The absurd nature of existence remains, whether we face traditional dilemmas or new technological ones."""
 
@@ -261,11 +551,11 @@ What strikes me most is how this modern concern echoes the eternal questions I'v
         """Basic fallback when everything fails"""
         persona_info = self.personas.get(persona, self.personas['camus'])
         
-        return f"""As {persona_info['name']}, I approach your question "{question}" through my {persona_info['style']} perspective.
+        return f"""As {persona_info.name}, I approach your question "{question}" through my {persona_info.style} perspective.
 
-This inquiry embodies the essential human struggle to understand {persona_info['concepts']}. 
+This inquiry embodies the essential human struggle to understand {persona_info.concepts}. 
 
-{persona_info['traits']} - I believe we must confront such questions directly, without illusion or false comfort.
+{persona_info.traits} - I believe we must confront such questions directly, without illusion or false comfort.
 
 The answer lies not in simple formulas, but in how we choose to live authentically in the face of uncertainty."""
 
@@ -284,11 +574,12 @@ def test_hf_chat():
             "What would you say about modern anxiety and technology?"
         ]
         
-        for question in test_questions:
+        # Ask all questions at once; total time is the slowest answer, not the sum
+        responses = chat.chat_many(test_questions, 'camus', max_concurrency=len(test_questions))
+        
+        for question, response in zip(test_questions, responses):
             print(f"\n📝 Question: {question}")
             print("-" * 40)
-            
-            response = chat.chat(question, 'camus')
             print(f"🤖 Camus responds: {response}")
             print()
             
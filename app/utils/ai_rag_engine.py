@@ -1,12 +1,183 @@
-import requests
+import hashlib
 import json
+import logging
 import os
+import re
+import threading
 import time
-from typing import List, Dict, Any
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import partial
+from heapq import nlargest
+from operator import itemgetter
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+from cachetools import LRUCache
+
+try:
+    import faiss
+    import sentence_transformers  # noqa: F401 - loaded through load_sentence_encoder
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    TFIDF_AVAILABLE = True
+except ImportError:
+    TFIDF_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from app.utils.batch_encoder import MicroBatchEncoder, load_sentence_encoder
+from app.utils.http_client import new_http_session
+from app.utils.semantic_cache import SemanticCache, SENTENCE_TRANSFORMERS_AVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Per-chunk character budget for retrieved context placed into a prompt
+MAX_CTX_CHARS = int(os.environ.get('MAX_CTX_CHARS', '1000'))
+
+def _loads(raw):
+    """Parse JSON text or bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# Where prepared chunk embeddings and their FAISS index are kept between restarts
+RAG_CACHE_DIR = os.environ.get('RAG_CACHE_DIR', 'data/processed/rag_cache')
+
+# Max concurrent Hugging Face inference requests per process
+HF_MAX_INFLIGHT = int(os.environ.get('HF_MAX_INFLIGHT', 16))
+_inflight = threading.BoundedSemaphore(HF_MAX_INFLIGHT)
+
+_PROMPT_TEMPLATE = """You are {name}, {description}.
+
+PHILOSOPHICAL CONTEXT:
+{{context_text}}
+
+QUESTION FROM HUMAN: "{{user_input}}"
+
+YOUR TASK: Respond as {name} would, with the following approach: {approach}
+
+Your response style should be: {style}
+
+Draw from the philosophical context provided above, but don't simply quote it. Instead, engage with the human's question thoughtfully and provide insights that reflect your philosophical perspective.
+
+RESPONSE:"""
+
+@dataclass(frozen=True)
+class Persona:
+    name: str
+    description: str
+    style: str
+    approach: str
+    # Prompt with only the context and question left to fill in, built once
+    prompt: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, 'prompt', _PROMPT_TEMPLATE.format(
+            name=self.name,
+            description=self.description,
+            style=self.style,
+            approach=self.approach
+        ))
+
+# Enhanced philosopher personas
+_PERSONAS = {
+    'camus': Persona(
+        name='Albert Camus',
+        description='French-Algerian philosopher, Nobel Prize winner, advocate of absurdism',
+        style='passionate, clear, uses concrete metaphors, focuses on human dignity',
+        approach='Emphasize the absurd condition, revolt against meaninglessness, and creating meaning through action'
+    ),
+    'dostoevsky': Persona(
+        name='Fyodor Dostoevsky',
+        description='Russian novelist and philosopher, explorer of human psychology',
+        style='intense, psychologically deep, morally complex, empathetic',
+        approach='Explore psychological depths, moral dilemmas, suffering as path to consciousness'
+    ),
+    'nietzsche': Persona(
+        name='Friedrich Nietzsche',
+        description='German philosopher, critic of traditional morality, advocate of will to power',
+        style='bold, provocative, aphoristic, challenging conventional thinking',
+        approach='Challenge traditional values, promote individual strength and self-creation'
+    ),
+    'neutral': Persona(
+        name='Philosophy Guide',
+        description='Knowledgeable guide through philosophical traditions',
+        style='clear, balanced, educational, connecting different perspectives',
+        approach='Present multiple viewpoints while encouraging critical thinking'
+    )
+}
+
+# Fallback responses based on philosopher and topic
+_FALLBACKS = {
+    'camus': {
+        'meaning': '''The absurd is born of the confrontation between human need for meaning and the meaningless silence of the world. But we must not despair! We revolt against this meaninglessness not by escaping it, but by fully acknowledging it and choosing to live anyway. The struggle itself toward the heights is enough to fill a person's heart. One must imagine Sisyphus happy.''',
+        'death': '''There is but one truly serious philosophical problem, and that is suicide. Judging whether life is or is not worth living amounts to answering the fundamental question of philosophy. I believe life is worth living precisely because it is absurd - we are free to create our own significance in defiance of meaninglessness.''',
+        'freedom': '''In the face of an absurd world, we have three options: suicide, philosophical escape, or revolt. I choose revolt - not violent revolution, but the passionate affirmation of life despite its ultimate meaninglessness. This revolt is our freedom, our dignity, our way of saying 'yes' to existence.''',
+        'suffering': '''There is scarcely any passion without struggle. The absurd man knows that in that consciousness and in that day-to-day revolt he gives proof of his only truth, which is defiance. Suffering is part of the human condition, but we must neither seek it nor flee from it - we must accept it as part of our absurd existence.'''
+    },
+    'dostoevsky': {
+        'evil': '''The problem of evil cuts to the very heart of human existence. Why does innocent suffering exist if there is a loving God? This question tormented Ivan Karamazov, and it torments us all. Perhaps suffering is the price of consciousness, the cost of our free will, or perhaps through it we learn compassion and find our deepest humanity.''',
+        'freedom': '''Man is tormented by no greater anxiety than to find someone quickly to whom he can hand over that great gift of freedom with which the ill-fated creature is born. We desperately want to be free, yet freedom terrifies us because it means taking full responsibility for our choices and their consequences.''',
+        'love': '''The soul is healed by being with other souls. Love is the bridge between isolation and connection, between despair and hope. We are all responsible for one another, and through love and understanding, we find redemption and meaning in our shared humanity.''',
+        'suffering': '''Pain and suffering are always inevitable for a large intelligence and a deep heart. But suffering is not meaningless - it is the sole origin of consciousness. Through suffering, we come to understand ourselves and develop compassion for others.'''
+    },
+    'nietzsche': {
+        'power': '''The will to power is the fundamental driving force of all life. It is not mere domination over others, but the power to overcome oneself, to create values, to become who you truly are. What does not kill you makes you stronger - embrace your struggles as opportunities for growth.''',
+        'morality': '''There are no moral phenomena, only moral interpretations of phenomena. Master morality creates values based on strength and nobility, while slave morality is reactive, based on resentment. We must move beyond good and evil to create new values for a new age.''',
+        'god': '''God is dead, and we have killed him. This is not a cause for despair but for celebration - now we are free to become gods ourselves, to create our own values and meaning. The übermensch is one who creates values rather than merely following them.''',
+        'existence': '''Become who you are! The individual has always had to struggle not to be overwhelmed by the tribe. You must have chaos within yourself to give birth to a dancing star. Embrace your uniqueness and create your own path.'''
+    }
+}
+
+# Topics of each philosopher's fallbacks, in preference order, and one pattern finding any of them
+_FALLBACK_TOPICS = {philosopher: list(topics) for philosopher, topics in _FALLBACKS.items()}
+_FALLBACK_TOPIC_RE = {
+    philosopher: re.compile('|'.join(map(re.escape, sorted(topics, key=len, reverse=True))))
+    for philosopher, topics in _FALLBACKS.items()
+}
+
+# General philosophical response when no fallback topic matches
+_GENERAL_FALLBACKS = {
+    'camus': "In this absurd world, we must create our own meaning through passionate engagement with life, even knowing it will end.",
+    'dostoevsky': "The human soul is complex and mysterious. Through understanding our contradictions, we find our humanity.",
+    'nietzsche': "Question everything, especially your assumptions about what you 'should' do. Create your own values and become who you are meant to be.",
+    'neutral': "This is a profound question that philosophers have grappled with for centuries. Let us explore it together through reason and reflection."
+}
 
 class AIEnhancedRAGEngine:
     """Enhanced RAG engine with REAL AI generation using FREE Hugging Face API"""
     
+    # Cosine similarity at which an earlier question's AI answer is reused
+    RESPONSE_CACHE_THRESHOLD = 0.85
+    # Similarity bonus for chunks by the requested philosopher in embedding retrieval
+    PHILOSOPHER_SIMILARITY_BONUS = 0.1
+    # Vocabulary cap for TF-IDF retrieval (unigrams and bigrams)
+    TFIDF_MAX_FEATURES = 50000
+    # Corpus size from which chunk embeddings are stored as int8 (flat float32 below it)
+    QUANTIZE_MIN_CHUNKS = 10000
+    # Number of recent (query, philosopher, top_k) retrievals remembered
+    RETRIEVAL_CACHE_SIZE = 1024
+    
+    GENERATION_PARAMETERS = {
+        "max_new_tokens": 200,
+        "temperature": 0.8,
+        "do_sample": True,
+        "top_p": 0.9,
+        "repetition_penalty": 1.1
+    }
+    # Query words that earn every chunk the topic bonus in keyword retrieval
+    _GENERIC_TOPICS = frozenset(['meaning', 'existence', 'death', 'freedom'])
+    _WORD_RE = re.compile(r'\w+')
+    
     def __init__(self):
         """Initialize with free AI generation capabilities."""
         print("🤖 Initializing AI-Enhanced RAG Engine...")
@@ -28,11 +199,34 @@ class AIEnhancedRAGEngine:
             'Content-Type': 'application/json'
         }
         
+        # Keep-alive pool for Hugging Face calls; carries the token, so it is not shared with other hosts
+        self.session = new_http_session()
+        self.session.headers.update(self.headers)
+        # Generation always targets the same endpoint with the same connect/read budget
+        # (give up quickly if the API is unreachable)
+        self._hf_post = partial(self.session.post, self.hf_endpoints['philosophy_model'], timeout=(3.05, 30))
+        
+        # Repeated questions skip retrieval scoring entirely
+        self._retrieval_cache = LRUCache(maxsize=self.RETRIEVAL_CACHE_SIZE)
+        self._retrieval_lock = threading.Lock()
+        self.retrieval_cache_hits = 0
+        self.retrieval_cache_misses = 0
+        
         # Load philosophy knowledge base
         self._load_philosophy_database()
         
         # Load text chunks for RAG
         self._load_text_chunks()
+        self._index_chunk_terms()
+        self._build_tfidf_matrix()
+        self._build_chunk_index()
+        
+        # Near-duplicate questions to the same philosopher reuse the earlier AI answer,
+        # sharing the retrieval encoder when it is loaded
+        self.response_cache = SemanticCache(
+            threshold=self.RESPONSE_CACHE_THRESHOLD,
+            embed=self.query_encoder.encode_one if self.query_encoder is not None else None
+        ) if SENTENCE_TRANSFORMERS_AVAILABLE else None
         
         print("✅ AI-Enhanced RAG Engine ready!")
     
@@ -99,14 +293,24 @@ class AIEnhancedRAGEngine:
                 ]
             }
         }
+        
+        # One alternation over every core concept, so a query is matched in a single scan
+        self._concept_to_topic = {
+            concept.lower(): topic
+            for topic, content in self.philosophy_db.items()
+            for concept in content['core_concepts']
+        }
+        self._concept_re = re.compile('|'.join(
+            re.escape(concept) for concept in sorted(self._concept_to_topic, key=len, reverse=True)
+        ))
     
     def _load_text_chunks(self):
         """Load processed text chunks for retrieval"""
         chunks_path = os.environ.get('CHUNKS_PATH', 'data/processed/chunks.json')
         try:
             if os.path.exists(chunks_path):
-                with open(chunks_path, 'r', encoding='utf-8') as f:
-                    self.chunks = json.load(f)
+                with open(chunks_path, 'rb') as f:
+                    self.chunks = _loads(f.read())
                 print(f"✅ Loaded {len(self.chunks)} philosophy text chunks")
             else:
                 self._create_enhanced_sample_chunks()
@@ -174,49 +378,239 @@ class AIEnhancedRAGEngine:
         ]
         print("✅ Created enhanced sample philosophy chunks")
     
+    def _index_chunk_terms(self):
+        """Lay chunk fields out as parallel arrays and build the inverted index: word -> ids of the chunks containing it"""
+        self._chunk_texts = [chunk['text'] for chunk in self.chunks]
+        self._chunk_sources = [chunk.get('source', 'Unknown') for chunk in self.chunks]
+        self._chunk_philosophers = np.array([chunk.get('philosopher', '').lower() for chunk in self.chunks], dtype=object)
+        # Topics as small integer codes into _topic_vocab
+        self._topic_vocab = {}
+        self._chunk_topics = np.array(
+            [self._topic_vocab.setdefault(chunk.get('topic', ''), len(self._topic_vocab)) for chunk in self.chunks],
+            dtype=np.int32
+        )
+        
+        # One scan of the query finds every chunk topic and generic topic word it contains.
+        # The lookahead matches at every position; a topic sharing its start with a longer
+        # match is recovered through _topics_within.
+        topics = sorted((set(self._topic_vocab) | self._GENERIC_TOPICS) - {''}, key=len, reverse=True)
+        self._topic_re = re.compile('(?=(%s))' % '|'.join(map(re.escape, topics)))
+        self._topics_within = {topic: [other for other in topics if other in topic] for topic in topics}
+        
+        postings = defaultdict(list)
+        for chunk_id, text in enumerate(self._chunk_texts):
+            for word in set(self._WORD_RE.findall(text.lower())):
+                postings[word].append(chunk_id)
+        self.postings = {word: np.array(chunk_ids, dtype=np.int32) for word, chunk_ids in postings.items()}
+    
+    def _philosopher_mask(self, philosopher: Optional[str]) -> Optional[np.ndarray]:
+        """Boolean mask of the requested philosopher's chunks, or None when there is no preference"""
+        if not philosopher or philosopher == 'neutral':
+            return None
+        return self._chunk_philosophers == philosopher.lower()
+    
+    def _build_tfidf_matrix(self):
+        """Fit TF-IDF over the chunks, so keyword retrieval is one sparse matrix-vector product"""
+        self.tfidf = None
+        if not TFIDF_AVAILABLE or not self.chunks:
+            return
+        
+        try:
+            self.tfidf = TfidfVectorizer(lowercase=True, ngram_range=(1, 2), max_features=self.TFIDF_MAX_FEATURES)
+            self.tfidf_matrix = self.tfidf.fit_transform(self._chunk_texts)
+        except ValueError as e:
+            # e.g. an empty vocabulary
+            print(f"⚠️ TF-IDF retrieval unavailable: {e}")
+            self.tfidf = None
+    
+    def _build_chunk_index(self):
+        """Embed every chunk once, so retrieval is a single inner-product search"""
+        self.encoder = None
+        self.query_encoder = None
+        self.chunk_index = None
+        if not EMBEDDINGS_AVAILABLE or not self.chunks:
+            return
+        
+        try:
+            model_name = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+            self.encoder = load_sentence_encoder(model_name)
+            # Concurrent queries share one forward pass
+            self.query_encoder = MicroBatchEncoder(self.encoder)
+            snapshot = self._index_snapshot_path(model_name)
+            if self._load_chunk_index(snapshot):
+                print(f"✅ Loaded {len(self.chunks)} chunk embeddings from {snapshot}.*")
+                return
+            
+            self.chunk_embs = np.asarray(self.encoder.encode(
+                self._chunk_texts,
+                batch_size=64,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            ), dtype=np.float32)
+            self.chunk_index = self._new_chunk_index(self.chunk_embs)
+            print(f"✅ Indexed {len(self.chunks)} chunk embeddings")
+            self._save_chunk_index(snapshot)
+        except Exception as e:
+            print(f"⚠️ Chunk embeddings unavailable, using keyword retrieval: {e}")
+            self.encoder = None
+            self.query_encoder = None
+            self.chunk_index = None
+    
+    def _index_snapshot_path(self, model_name: str) -> str:
+        """Snapshot file prefix, fingerprinted by model and chunk texts so a changed corpus is re-embedded"""
+        fingerprint = hashlib.blake2b(
+            json.dumps([model_name, self._chunk_texts]).encode('utf-8'),
+            digest_size=8
+        ).hexdigest()
+        return os.path.join(RAG_CACHE_DIR, f"chunks.{fingerprint}")
+    
+    def _load_chunk_index(self, snapshot: str) -> bool:
+        """Restore embeddings and index saved by an earlier start with the same corpus"""
+        try:
+            self.chunk_embs = np.load(f"{snapshot}.emb.npy", mmap_mode='r')
+            self.chunk_index = faiss.read_index(f"{snapshot}.faiss")
+        except (OSError, RuntimeError, ValueError):
+            # Missing or unreadable snapshot (faiss raises RuntimeError)
+            return False
+        return self.chunk_index.ntotal == len(self.chunks)
+    
+    def _save_chunk_index(self, snapshot: str):
+        """Write embeddings and index next to each other; each file is swapped in atomically"""
+        try:
+            os.makedirs(os.path.dirname(snapshot), exist_ok=True)
+            with open(f"{snapshot}.emb.npy.tmp", 'wb') as f:
+                np.save(f, self.chunk_embs)
+            os.replace(f"{snapshot}.emb.npy.tmp", f"{snapshot}.emb.npy")
+            faiss.write_index(self.chunk_index, f"{snapshot}.faiss.tmp")
+            os.replace(f"{snapshot}.faiss.tmp", f"{snapshot}.faiss")
+        except (OSError, RuntimeError) as e:
+            print(f"⚠️ Could not save chunk embeddings snapshot: {e}")
+    
+    def _new_chunk_index(self, embeddings: np.ndarray):
+        """Exact inner-product index for small corpora, 8-bit scalar-quantized for large ones"""
+        dim = embeddings.shape[1]
+        if len(embeddings) < self.QUANTIZE_MIN_CHUNKS:
+            index = faiss.IndexFlatIP(dim)
+        else:
+            # A quarter of the memory traffic per search, at a negligible recall cost
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            index.train(embeddings)
+        index.add(embeddings)
+        return index
+    
     def retrieve_context(self, query: str, philosopher: str = None, top_k: int = 3) -> List[str]:
-        """Enhanced context retrieval with topic matching"""
+        """Enhanced context retrieval with topic matching, memoized per (query, philosopher, top_k)"""
+        key = (query.lower().strip(), philosopher, top_k)
+        with self._retrieval_lock:
+            contexts = self._retrieval_cache.get(key)
+            if contexts is not None:
+                self.retrieval_cache_hits += 1
+                return list(contexts)
+            self.retrieval_cache_misses += 1
+        
+        contexts = tuple(self._retrieve_context_uncached(key[0], philosopher, top_k))
+        with self._retrieval_lock:
+            self._retrieval_cache[key] = contexts
+        return list(contexts)
+    
+    def clear_retrieval_cache(self):
+        """Forget memoized retrievals - call after changing the chunks or philosophy database"""
+        with self._retrieval_lock:
+            self._retrieval_cache.clear()
+    
+    def _retrieve_context_uncached(self, query: str, philosopher: Optional[str], top_k: int) -> List[str]:
         query_lower = query.lower()
         relevant_contexts = []
         
         # 1. Search philosophy database by topic
+        matched_topics = {self._concept_to_topic[m.group(0)] for m in self._concept_re.finditer(query_lower)}
         for topic, content in self.philosophy_db.items():
-            if any(concept.lower() in query_lower for concept in content['core_concepts']):
+            if topic in matched_topics:
                 relevant_contexts.append(f"PHILOSOPHICAL CONCEPT - {topic.upper()}: {content['definition']}")
                 relevant_contexts.extend(content['famous_quotes'][:2])
         
-        # 2. Search text chunks with advanced matching
-        chunk_scores = []
-        for chunk in self.chunks:
-            score = 0
-            chunk_text = chunk['text'].lower()
-            
-            # Keyword matching
-            query_words = query_lower.split()
-            for word in query_words:
-                if word in chunk_text:
-                    score += 1
-            
-            # Philosopher preference
-            if philosopher and philosopher != 'neutral':
-                if chunk.get('philosopher', '').lower() == philosopher.lower():
-                    score += 5
-            
-            # Topic matching
-            chunk_topic = chunk.get('topic', '')
-            if any(topic in query_lower for topic in [chunk_topic, 'meaning', 'existence', 'death', 'freedom']):
-                score += 3
-            
-            if score > 0:
-                chunk_scores.append((score, chunk['text'], chunk.get('source', 'Unknown')))
+        # 2. Search text chunks, by embedding similarity, TF-IDF or keywords - whichever is available
+        if self.chunk_index is not None:
+            chunk_scores = self._semantic_chunk_scores(query, philosopher, top_k)
+        elif self.tfidf is not None:
+            chunk_scores = self._tfidf_chunk_scores(query_lower, philosopher, top_k)
+        else:
+            chunk_scores = self._keyword_chunk_scores(query_lower, philosopher)
         
-        # Sort by relevance and add to context
-        chunk_scores.sort(key=lambda x: x[0], reverse=True)
-        for score, text, source in chunk_scores[:top_k]:
+        # Add the most relevant to context (ties keep chunk order, as a stable sort would)
+        for score, text, source in nlargest(top_k, chunk_scores, key=itemgetter(0)):
             relevant_contexts.append(f"FROM {source}: {text}")
         
         return relevant_contexts[:top_k + 2]  # Return top contexts
     
+    def _semantic_chunk_scores(self, query: str, philosopher: Optional[str], top_k: int) -> List[Tuple[float, str, str]]:
+        """Score the chunks most similar to the query, preferring the requested philosopher"""
+        query_emb = self.query_encoder.encode_one(query)[None, :]
+        # Over-fetch so the philosopher preference can still reorder close candidates
+        similarities, ids = self.chunk_index.search(query_emb, min(len(self.chunks), top_k * 4))
+        found = ids[0] >= 0
+        ids, scores = ids[0][found], similarities[0][found]
+        
+        mask = self._philosopher_mask(philosopher)
+        if mask is not None:
+            scores = scores + self.PHILOSOPHER_SIMILARITY_BONUS * mask[ids]
+        return self._scored_chunks(ids, scores)
+    
+    def _tfidf_chunk_scores(self, query_lower: str, philosopher: Optional[str], top_k: int) -> List[Tuple[float, str, str]]:
+        """Score chunks by TF-IDF cosine similarity, preferring the requested philosopher"""
+        scores = (self.tfidf_matrix @ self.tfidf.transform([query_lower]).T).toarray().ravel()
+        mask = self._philosopher_mask(philosopher)
+        if mask is not None:
+            scores += self.PHILOSOPHER_SIMILARITY_BONUS * mask
+        
+        if len(scores) > top_k:
+            candidates = np.argpartition(-scores, top_k)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        # Chunk order breaks ties, as in keyword scoring
+        candidates = np.sort(candidates[scores[candidates] > 0])
+        return self._scored_chunks(candidates, scores[candidates])
+    
+    def _keyword_chunk_scores(self, query_lower: str, philosopher: Optional[str]) -> List[Tuple[int, str, str]]:
+        """Score chunks by keyword overlap, philosopher and topic"""
+        scores = np.zeros(len(self.chunks), dtype=np.int64)
+        
+        # Keyword matching: one point per query word found in the chunk
+        for word in self._WORD_RE.findall(query_lower):
+            chunk_ids = self.postings.get(word)
+            if chunk_ids is not None:
+                scores[chunk_ids] += 1
+        
+        # Philosopher preference
+        mask = self._philosopher_mask(philosopher)
+        if mask is not None:
+            scores[mask] += 5
+        
+        # Topic matching
+        matched = {
+            topic
+            for found in self._topic_re.findall(query_lower)
+            for topic in self._topics_within[found]
+        }
+        matched.add('')  # Chunks without a topic always match, as before
+        if matched & self._GENERIC_TOPICS:
+            scores += 3
+        else:
+            codes = [code for topic, code in self._topic_vocab.items() if topic in matched]
+            if codes:
+                scores[np.isin(self._chunk_topics, codes)] += 3
+        
+        # Chunk order breaks ties, as before
+        matched = np.flatnonzero(scores)
+        return self._scored_chunks(matched, scores[matched])
+    
+    def _scored_chunks(self, chunk_ids: np.ndarray, scores: np.ndarray) -> List[Tuple[Any, str, str]]:
+        """(score, text, source) per chunk, as retrieve_context ranks them"""
+        return [
+            (score, self._chunk_texts[chunk_id], self._chunk_sources[chunk_id])
+            for chunk_id, score in zip(chunk_ids.tolist(), scores.tolist())
+        ]
+    
     def generate_ai_response(self, user_input: str, philosopher: str, context: List[str]) -> Dict[str, Any]:
         """Generate response using Hugging Face API with enhanced prompting"""
         
@@ -225,149 +619,131 @@ class AIEnhancedRAGEngine:
             return self._generate_fallback_response(user_input, philosopher, context)
         
         try:
-            # Prepare context
-            context_text = "\n\n".join(context) if context else "No specific context available."
+            if self.response_cache is not None:
+                cached = self.response_cache.lookup(philosopher, user_input)
+                if cached is not None:
+                    logger.debug("⚡ Semantic cache hit")
+                    return cached
             
-            # Enhanced philosopher personas
-            personas = {
-                'camus': {
-                    'name': 'Albert Camus',
-                    'description': 'French-Algerian philosopher, Nobel Prize winner, advocate of absurdism',
-                    'style': 'passionate, clear, uses concrete metaphors, focuses on human dignity',
-                    'approach': 'Emphasize the absurd condition, revolt against meaninglessness, and creating meaning through action'
-                },
-                'dostoevsky': {
-                    'name': 'Fyodor Dostoevsky',
-                    'description': 'Russian novelist and philosopher, explorer of human psychology',
-                    'style': 'intense, psychologically deep, morally complex, empathetic',
-                    'approach': 'Explore psychological depths, moral dilemmas, suffering as path to consciousness'
-                },
-                'nietzsche': {
-                    'name': 'Friedrich Nietzsche',
-                    'description': 'German philosopher, critic of traditional morality, advocate of will to power',
-                    'style': 'bold, provocative, aphoristic, challenging conventional thinking',
-                    'approach': 'Challenge traditional values, promote individual strength and self-creation'
-                },
-                'neutral': {
-                    'name': 'Philosophy Guide',
-                    'description': 'Knowledgeable guide through philosophical traditions',
-                    'style': 'clear, balanced, educational, connecting different perspectives',
-                    'approach': 'Present multiple viewpoints while encouraging critical thinking'
-                }
-            }
+            prompt = self._build_prompt(user_input, philosopher, context)
             
-            persona_info = personas.get(philosopher, personas['neutral'])
-            
-            # Create comprehensive prompt
-            prompt = f"""You are {persona_info['name']}, {persona_info['description']}.
-
-PHILOSOPHICAL CONTEXT:
-{context_text}
-
-QUESTION FROM HUMAN: "{user_input}"
-
-YOUR TASK: Respond as {persona_info['name']} would, with the following approach: {persona_info['approach']}
-
-Your response style should be: {persona_info['style']}
-
-Draw from the philosophical context provided above, but don't simply quote it. Instead, engage with the human's question thoughtfully and provide insights that reflect your philosophical perspective.
-
-RESPONSE:"""
-
             # Call Hugging Face API
-            payload = {
-                "inputs": prompt,
-                "parameters": {
-                    "max_new_tokens": 200,
-                    "temperature": 0.8,
-                    "do_sample": True,
-                    "top_p": 0.9,
-                    "repetition_penalty": 1.1
-                }
-            }
+            payload = {"inputs": prompt, "parameters": self.GENERATION_PARAMETERS}
             
-            print("🤖 Calling Hugging Face API...")
-            response = requests.post(
-                self.hf_endpoints['philosophy_model'],
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
+            logger.debug("🤖 Calling Hugging Face API...")
+            with _inflight:
+                response = self._hf_post(json=payload)
             
             if response.status_code == 200:
-                result = response.json()
-                print("✅ AI response generated successfully!")
+                result = _loads(response.content)
+                logger.debug("✅ AI response generated successfully!")
                 
                 if isinstance(result, list) and len(result) > 0:
                     generated_text = result[0].get('generated_text', '')
                     
-                    # Extract only the new response
-                    if 'RESPONSE:' in generated_text:
-                        ai_response = generated_text.split('RESPONSE:')[-1].strip()
-                    else:
-                        ai_response = generated_text.replace(prompt, '').strip()
+                    # Extract only the new response. The prompt ends with the marker, so text
+                    # without it contains no echoed prompt and is kept whole.
+                    ai_response = generated_text.rpartition('RESPONSE:')[2].strip()
                     
                     # Clean up response
                     ai_response = ai_response.replace('\n\n', '\n').strip()
                     
                     if ai_response and len(ai_response) > 10:
-                        return {
-                            'message': ai_response,
-                            'sources': [{'text': ctx[:100] + '...' if len(ctx) > 100 else ctx, 'relevance': 'high'} for ctx in context[:3]],
-                            'generated_by': 'huggingface_api'
-                        }
+                        return self._ai_result(user_input, philosopher, context, ai_response)
             
-            print(f"⚠️ API response issue: {response.status_code}")
+            logger.warning("⚠️ API response issue: %s", response.status_code)
             return self._generate_fallback_response(user_input, philosopher, context)
             
         except Exception as e:
-            print(f"❌ Error calling AI API: {e}")
+            logger.warning("❌ Error calling AI API: %s", e)
             return self._generate_fallback_response(user_input, philosopher, context)
     
-    def _generate_fallback_response(self, user_input: str, philosopher: str, context: List[str]) -> Dict[str, Any]:
-        """Enhanced fallback responses when API fails"""
-        input_lower = user_input.lower()
+    def generate_ai_response_stream(self, user_input: str, philosopher: str, context: List[str]) -> Iterator[str]:
+        """Yield the AI response as Hugging Face generates it (TGI server-sent events).
+        Yields the fallback response in one piece if the API is not configured or fails before answering."""
+        if not self.hf_token or self.hf_token == 'your_free_hf_token_here':
+            yield self._generate_fallback_response(user_input, philosopher, context)['message']
+            return
         
-        # Enhanced responses based on philosopher and topic
-        responses = {
-            'camus': {
-                'meaning': '''The absurd is born of the confrontation between human need for meaning and the meaningless silence of the world. But we must not despair! We revolt against this meaninglessness not by escaping it, but by fully acknowledging it and choosing to live anyway. The struggle itself toward the heights is enough to fill a person's heart. One must imagine Sisyphus happy.''',
-                'death': '''There is but one truly serious philosophical problem, and that is suicide. Judging whether life is or is not worth living amounts to answering the fundamental question of philosophy. I believe life is worth living precisely because it is absurd - we are free to create our own significance in defiance of meaninglessness.''',
-                'freedom': '''In the face of an absurd world, we have three options: suicide, philosophical escape, or revolt. I choose revolt - not violent revolution, but the passionate affirmation of life despite its ultimate meaninglessness. This revolt is our freedom, our dignity, our way of saying 'yes' to existence.''',
-                'suffering': '''There is scarcely any passion without struggle. The absurd man knows that in that consciousness and in that day-to-day revolt he gives proof of his only truth, which is defiance. Suffering is part of the human condition, but we must neither seek it nor flee from it - we must accept it as part of our absurd existence.'''
-            },
-            'dostoevsky': {
-                'evil': '''The problem of evil cuts to the very heart of human existence. Why does innocent suffering exist if there is a loving God? This question tormented Ivan Karamazov, and it torments us all. Perhaps suffering is the price of consciousness, the cost of our free will, or perhaps through it we learn compassion and find our deepest humanity.''',
-                'freedom': '''Man is tormented by no greater anxiety than to find someone quickly to whom he can hand over that great gift of freedom with which the ill-fated creature is born. We desperately want to be free, yet freedom terrifies us because it means taking full responsibility for our choices and their consequences.''',
-                'love': '''The soul is healed by being with other souls. Love is the bridge between isolation and connection, between despair and hope. We are all responsible for one another, and through love and understanding, we find redemption and meaning in our shared humanity.''',
-                'suffering': '''Pain and suffering are always inevitable for a large intelligence and a deep heart. But suffering is not meaningless - it is the sole origin of consciousness. Through suffering, we come to understand ourselves and develop compassion for others.'''
-            },
-            'nietzsche': {
-                'power': '''The will to power is the fundamental driving force of all life. It is not mere domination over others, but the power to overcome oneself, to create values, to become who you truly are. What does not kill you makes you stronger - embrace your struggles as opportunities for growth.''',
-                'morality': '''There are no moral phenomena, only moral interpretations of phenomena. Master morality creates values based on strength and nobility, while slave morality is reactive, based on resentment. We must move beyond good and evil to create new values for a new age.''',
-                'god': '''God is dead, and we have killed him. This is not a cause for despair but for celebration - now we are free to become gods ourselves, to create our own values and meaning. The übermensch is one who creates values rather than merely following them.''',
-                'existence': '''Become who you are! The individual has always had to struggle not to be overwhelmed by the tribe. You must have chaos within yourself to give birth to a dancing star. Embrace your uniqueness and create your own path.'''
+        text = ""
+        try:
+            if self.response_cache is not None:
+                cached = self.response_cache.lookup(philosopher, user_input)
+                if cached is not None:
+                    logger.debug("⚡ Semantic cache hit")
+                    yield cached['message']
+                    return
+            
+            payload = {
+                "inputs": self._build_prompt(user_input, philosopher, context),
+                "parameters": self.GENERATION_PARAMETERS,
+                "stream": True
             }
-        }
+            
+            logger.debug("🤖 Streaming from Hugging Face API...")
+            with _inflight, self._hf_post(
+                json=payload,
+                headers={'Accept': 'text/event-stream'},
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning("⚠️ API response issue: %s", response.status_code)
+                else:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith('data:'):
+                            continue
+                        token = _loads(line[5:]).get('token') or {}
+                        if token.get('special'):
+                            continue
+                        delta = token.get('text', '')
+                        if not text:
+                            delta = delta.lstrip()
+                        if delta:
+                            text += delta
+                            yield delta
+        except Exception as e:
+            logger.warning("❌ Error streaming from AI API: %s", e)
         
-        philosopher_responses = responses.get(philosopher, {})
+        if not text:
+            yield self._generate_fallback_response(user_input, philosopher, context)['message']
+        elif len(text.strip()) > 10:
+            logger.debug("✅ AI response streamed successfully!")
+            self._ai_result(user_input, philosopher, context, text.replace('\n\n', '\n').strip())
+    
+    def _build_prompt(self, user_input: str, philosopher: str, context: List[str]) -> str:
+        context_text = "\n\n".join(ctx[:MAX_CTX_CHARS] for ctx in context) if context else "No specific context available."
+        return _PERSONAS.get(philosopher, _PERSONAS['neutral']).prompt.format(
+            context_text=context_text,
+            user_input=user_input
+        )
+    
+    def _ai_result(self, user_input: str, philosopher: str, context: List[str], ai_response: str) -> Dict[str, Any]:
+        """Package a generated answer and remember it for similar questions"""
+        result = {
+            'message': ai_response,
+            'sources': [{'text': ctx[:100] + '...' if len(ctx) > 100 else ctx, 'relevance': 'high'} for ctx in context[:3]],
+            'generated_by': 'huggingface_api'
+        }
+        if self.response_cache is not None:
+            self.response_cache.store(philosopher, user_input, result)
+        return result
+    
+    def _generate_fallback_response(self, user_input: str, philosopher: str, context: List[str]) -> Dict[str, Any]:
+        """Enhanced fallback responses when API fails"""
+        input_lower = user_input.lower()
         
         # Find best matching response
         best_response = None
-        for topic, response in philosopher_responses.items():
-            if topic in input_lower or any(word in input_lower for word in topic.split()):
-                best_response = response
-                break
+        topic_re = _FALLBACK_TOPIC_RE.get(philosopher)
+        if topic_re is not None:
+            matched = set(topic_re.findall(input_lower))
+            for topic in _FALLBACK_TOPICS[philosopher]:
+                if topic in matched:
+                    best_response = _FALLBACKS[philosopher][topic]
+                    break
         
         if not best_response:
-            # General philosophical response
-            general_responses = {
-                'camus': "In this absurd world, we must create our own meaning through passionate engagement with life, even knowing it will end.",
-                'dostoevsky': "The human soul is complex and mysterious. Through understanding our contradictions, we find our humanity.",
-                'nietzsche': "Question everything, especially your assumptions about what you 'should' do. Create your own values and become who you are meant to be.",
-                'neutral': "This is a profound question that philosophers have grappled with for centuries. Let us explore it together through reason and reflection."
-            }
-            best_response = general_responses.get(philosopher, general_responses['neutral'])
+            best_response = _GENERAL_FALLBACKS.get(philosopher, _GENERAL_FALLBACKS['neutral'])
         
         # Add context if available
         if context:
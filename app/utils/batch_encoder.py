@@ -0,0 +1,85 @@
+"""
+Micro-batching for sentence embeddings - concurrent single-query encodes
+arriving within a few milliseconds share one batched forward pass
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import List, Tuple
+
+import numpy as np
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+
+def load_sentence_encoder(model_name: str):
+    """Load a SentenceTransformer, in half precision on GPU when one is available"""
+    from sentence_transformers import SentenceTransformer
+
+    if TORCH_AVAILABLE and torch.cuda.is_available():
+        return SentenceTransformer(model_name, device='cuda').half()
+    return SentenceTransformer(model_name)
+
+
+class MicroBatchEncoder:
+    """
+    Wraps a model with an `encode(texts, ...)` method. The first caller of a
+    batch waits up to `window` seconds (less once `max_batch` texts are queued)
+    for others to join, then encodes the whole batch and hands each caller its
+    row. No background thread is involved, so it is safe to create before fork.
+    """
+
+    def __init__(self, model, max_batch: int = 32, window: float = 0.01):
+        self.model = model
+        self.max_batch = max_batch
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._collecting = False
+        self._full = threading.Event()
+
+    def encode_one(self, text: str) -> np.ndarray:
+        """Return the unit-normalized float32 embedding of `text`"""
+        future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            leader = not self._collecting
+            self._collecting = True
+            if len(self._pending) >= self.max_batch:
+                self._full.set()
+
+        if leader:
+            self._full.wait(self.window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                self._collecting = False
+                self._full.clear()
+            self._encode_batch(batch)
+        return future.result()
+
+    def _encode_batch(self, batch: List[Tuple[str, Future]]):
+        try:
+            texts = [text for text, _ in batch]
+            if TORCH_AVAILABLE:
+                with torch.inference_mode():
+                    embeddings = self._encode(texts)
+            else:
+                embeddings = self._encode(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), embedding in zip(batch, embeddings):
+            future.set_result(embedding)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(
+            texts,
+            batch_size=self.max_batch,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ), dtype=np.float32)
@@ -0,0 +1,178 @@
+"""
+Bounded, thread-safe conversation history for the chat models, plus the
+Redis-backed transcript log shown by /api/conversation
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from cachetools import LRUCache
+
+try:
+    import msgpack
+    import redis
+    REDIS_STORE_AVAILABLE = True
+except ImportError:
+    REDIS_STORE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore:
+    """
+    Per-conversation message history shared across request threads.
+    Each conversation keeps its last `max_messages` messages, and the least
+    recently used conversations are evicted once `max_conversations` is reached.
+    """
+
+    def __init__(self, max_messages: int, max_conversations: int = 10_000):
+        self.max_messages = max_messages
+        self._lock = threading.RLock()
+        self._conversations = LRUCache(maxsize=max_conversations)
+
+    def append(self, conversation_id: str, *messages: Dict[str, str]):
+        """Append messages to a conversation, dropping its oldest ones past the limit"""
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                conversation = deque(maxlen=self.max_messages)
+                self._conversations[conversation_id] = conversation
+            conversation.extend(messages)
+
+    def get(self, conversation_id: str) -> List[Dict[str, str]]:
+        """Return a snapshot of a conversation's messages, oldest first"""
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            return list(conversation) if conversation is not None else []
+
+    def clear(self, conversation_id: str) -> bool:
+        """Forget a conversation. Returns True if it existed."""
+        with self._lock:
+            return self._conversations.pop(conversation_id, None) is not None
+
+    def __contains__(self, conversation_id: str) -> bool:
+        with self._lock:
+            return conversation_id in self._conversations
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._conversations)
+
+
+class RedisConversationStore:
+    """
+    Conversation history kept in Redis so every worker sees the same turns and
+    history survives restarts. Each conversation is a list at `conv:{id}`,
+    newest message first, holding compact msgpack records ({'r': role, 'c': content})
+    with the common roles stored as 0/1. Idle conversations expire after `ttl` seconds.
+    """
+
+    KEY_PREFIX = 'conv:'
+    _ROLE_CODES = {'user': 0, 'assistant': 1}
+    _ROLE_NAMES = {code: role for role, code in _ROLE_CODES.items()}
+
+    def __init__(self, client, max_messages: int, ttl: int = 86_400):
+        self.client = client
+        self.max_messages = max_messages
+        self.ttl = ttl
+
+    def _key(self, conversation_id: str) -> str:
+        return self.KEY_PREFIX + conversation_id
+
+    def _pack(self, message: Dict[str, str]) -> bytes:
+        role = message.get('role')
+        return msgpack.packb({'r': self._ROLE_CODES.get(role, role), 'c': message.get('content', '')})
+
+    def _unpack(self, raw: bytes) -> Dict[str, str]:
+        record = msgpack.unpackb(raw)
+        return {'role': self._ROLE_NAMES.get(record['r'], record['r']), 'content': record['c']}
+
+    def append(self, conversation_id: str, *messages: Dict[str, str]):
+        """Append messages, trim to the limit and refresh the expiry in one round trip"""
+        if not messages:
+            return
+        key = self._key(conversation_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(key, *(self._pack(message) for message in messages))
+        pipe.ltrim(key, 0, self.max_messages - 1)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get(self, conversation_id: str) -> List[Dict[str, str]]:
+        """Return a conversation's messages, oldest first"""
+        raw = self.client.lrange(self._key(conversation_id), 0, self.max_messages - 1)
+        return [self._unpack(item) for item in reversed(raw)]
+
+    def clear(self, conversation_id: str) -> bool:
+        """Forget a conversation. Returns True if it existed."""
+        return bool(self.client.delete(self._key(conversation_id)))
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return bool(self.client.exists(self._key(conversation_id)))
+
+
+class RedisConversationLog:
+    """
+    Per-conversation transcript of chat exchanges ({'user', 'philosopher',
+    'response'} entries) kept server-side, so nothing has to be squeezed into
+    the session cookie. Each log is a list at `chatlog:{id}`, newest first,
+    capped at `max_entries` msgpack records and expiring after `ttl` seconds idle.
+    """
+
+    KEY_PREFIX = 'chatlog:'
+
+    def __init__(self, client, max_entries: int = 50, ttl: int = 86_400):
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def _key(self, conversation_id: str) -> str:
+        return self.KEY_PREFIX + conversation_id
+
+    def append(self, conversation_id: str, entry: Dict[str, Any]):
+        """Record an exchange, trim to the cap and refresh the expiry in one round trip"""
+        key = self._key(conversation_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lpush(key, msgpack.packb(entry))
+        pipe.ltrim(key, 0, self.max_entries - 1)
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+    def get(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Return the logged exchanges, oldest first"""
+        raw = self.client.lrange(self._key(conversation_id), 0, -1)
+        return [msgpack.unpackb(item) for item in reversed(raw)]
+
+    def clear(self, conversation_id: str) -> bool:
+        """Forget a conversation's log. Returns True if it existed."""
+        return bool(self.client.delete(self._key(conversation_id)))
+
+
+@lru_cache(maxsize=None)
+def get_redis_client(redis_url: str):
+    """One client (and connection pool) per Redis URL for the whole process"""
+    return redis.Redis.from_url(redis_url)
+
+
+def create_conversation_store(max_messages: int):
+    """Return a Redis-backed store when REDIS_URL is set, else an in-process one"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url:
+        if REDIS_STORE_AVAILABLE:
+            ttl = int(os.environ.get('CONVERSATION_TTL_SECONDS', 86_400))
+            return RedisConversationStore(get_redis_client(redis_url), max_messages=max_messages, ttl=ttl)
+        logger.warning("REDIS_URL set but redis/msgpack not installed; keeping conversations in memory")
+    return ConversationStore(max_messages=max_messages)
+
+
+def create_conversation_log() -> Optional[RedisConversationLog]:
+    """Return a Redis transcript log when REDIS_URL is set, else None (callers keep using the session)"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url and REDIS_STORE_AVAILABLE:
+        ttl = int(os.environ.get('CONVERSATION_TTL_SECONDS', 86_400))
+        return RedisConversationLog(get_redis_client(redis_url), ttl=ttl)
+    return None
@@ -6,18 +6,62 @@ FREE, FAST, and RELIABLE AI generation using Groq's inference API
 
 import os
 import sys
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+if __name__ == "__main__":
+    # Run as a script: make the `app` package importable
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-# Load environment variables
 from dotenv import load_dotenv
-load_dotenv()
 
 import requests
 import json
-from typing import List, Dict, Any, Optional
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
+from functools import cached_property
+
+from cachetools import LRUCache
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from app.utils.http_client import get_http2_client, get_http_session
+from app.utils.internet_rag_engine import InternetRAGEngine, get_internet_rag_engine
+from app.utils.semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+_env_loaded = False
+
+def _ensure_env():
+    """Load .env once per process - the app does this in create_app(), but scripts and
+    other importers construct the chat directly"""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+def _dumps(payload) -> bytes:
+    """Serialize a request body to JSON bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+def _loads(raw):
+    """Parse JSON text or bytes, with orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
-from app.utils.internet_rag_engine import InternetRAGEngine
+# Internet searches run here so the Groq connection can be warmed meanwhile
+_search_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='groq-search')
+# Model queries for non-streamed answers, shared by every chat in the process
+_model_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='groq-model')
 
 @dataclass
 class GroqModel:
@@ -32,8 +76,45 @@ class GroqPhilosopherChat:
     Much faster and more reliable than Hugging Face!
     """
     
-    def __init__(self):
-        self.search_engine = InternetRAGEngine()
+    # Wait this long for a model's answer before also asking the next one
+    HEDGE_DELAY_SECONDS = 3.0
+    # Longest wait for the internet search before answering without its context
+    SEARCH_TIMEOUT_SECONDS = 10
+    # A pooled connection idle this long may have been dropped; a new one is opened during the search
+    CONNECTION_IDLE_SECONDS = 60
+    # Answers remembered verbatim per (persona, question), checked before the semantic cache
+    EXACT_CACHE_SIZE = 512
+    
+    # Static text of the full prompt around the internet context and the question
+    PROMPT_INSTRUCTIONS = (
+        "\n\nDraw from both your philosophical foundation and contemporary discussions. Engage with the question "
+        "directly, naturally, and authentically. No need to introduce yourself - simply share your thoughts with "
+        "intellectual depth and personal conviction.\n"
+        "Respond strictly in clear English only.\n\n"
+    )
+    PROMPT_CLOSING = "Share your philosophical perspective in 250-400 words:"
+    
+    def __init__(
+        self,
+        http_session: Optional[requests.Session] = None,
+        response_cache: Optional[SemanticCache] = None
+    ):
+        _ensure_env()
+        # Shared keep-alive pool, so repeated Groq calls skip the TLS handshake. With
+        # httpx[http2] installed, concurrent calls also multiplex over one connection.
+        self.http = http_session or get_http2_client() or get_http_session()
+        # Pre-serialized bodies go in `content=` for httpx and `data=` for requests
+        self._body_param = 'content' if callable(getattr(self.http, 'stream', None)) else 'data'
+        # A near-identical question to the same persona skips both the search and the model.
+        # Not built by default: the app passes its own cache, so one embedding model and
+        # one similarity threshold serve both (entries are kept under "groq:" namespaces).
+        self.response_cache = response_cache
+        # Exact repeats are answered without embedding anything, with or without sentence-transformers
+        self._exact_cache = LRUCache(maxsize=self.EXACT_CACHE_SIZE)
+        self._exact_cache_lock = threading.Lock()
+        # When a request last went over the pooled connection; guarded since chats run concurrently
+        self._connection_used_at = float('-inf')
+        self._connection_lock = threading.Lock()
         self.api_key = os.getenv('GROQ_API_KEY')
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found. Get free key at: https://console.groq.com/")
@@ -42,6 +123,11 @@ class GroqPhilosopherChat:
         self.setup_models()
         self.setup_personas()
         
+    @cached_property
+    def search_engine(self) -> InternetRAGEngine:
+        """The process-wide search engine, built on the first search rather than with every chat"""
+        return get_internet_rag_engine()
+    
     def setup_models(self):
         """Setup Groq's free models - all are FAST and FREE!"""
         self.models = [
@@ -119,50 +205,46 @@ class GroqPhilosopherChat:
                 'approach': 'embraces pessimism as a form of intellectual honesty and finds beauty in hopelessness'
             }
         }
-    
-    def create_philosophical_prompt(self, question: str, persona_name: str, context: List[Dict]) -> str:
-        """Create sophisticated prompt for Groq models"""
-        persona = self.personas.get(persona_name, self.personas['camus'])
-        
-        # Format internet context
-        context_text = self._format_context(context)
         
-        system_prompt = f"""You possess the philosophical perspective and worldview of {persona['name']}, the {persona['style']}. 
+        # The persona part of the prompt never changes, so it is built once and leads every
+        # prompt byte-for-byte, which lets Groq's prompt caching reuse it across questions
+        self._prompt_prefixes = {
+            key: f"""You possess the philosophical perspective and worldview of {persona['name']}, the {persona['style']}. 
 
 Your natural voice: {persona['voice']}
 Your core insights: {persona['concepts']}
 Your unique approach: {persona['approach']}
 
 Current intellectual discourse:
-{context_text}
-
-Draw from both your philosophical foundation and contemporary discussions. Engage with the question directly, naturally, and authentically. No need to introduce yourself - simply share your thoughts with intellectual depth and personal conviction.
-Respond strictly in clear English only.
-
-Question: "{question}"
-
-Share your philosophical perspective in 250-400 words:"""
-
-        return system_prompt
+"""
+            for key, persona in self.personas.items()
+        }
+    
+    def create_philosophical_prompt(self, question: str, persona_name: str, context: List[Dict]) -> str:
+        """Create sophisticated prompt for Groq models"""
+        prefix = self._prompt_prefixes.get(persona_name) or self._prompt_prefixes['camus']
+        
+        # Format internet context
+        context_text = self._format_context(context)
+        
+        return f'{prefix}{context_text}{self.PROMPT_INSTRUCTIONS}Question: "{question}"\n\n{self.PROMPT_CLOSING}'
     
     def _format_context(self, sources: List[Dict]) -> str:
         """Format internet sources for the prompt"""
         if not sources:
             return "No current internet discussions available."
             
-        context_parts = []
-        for i, source in enumerate(sources[:4], 1):  # Use top 4 sources
-            title = source.get('title', 'Unknown')[:70]
-            content = source.get('content', '')[:180]
-            source_name = source.get('source', 'Unknown')
-            
-            context_parts.append(f"[{i}] From {source_name}: '{title}'\n    {content}...")
-            
-        return "\n\n".join(context_parts)
+        # Use top 4 sources. create_philosophical_prompt is public, so sources may not have been
+        # trimmed by _search; bound both fields here (content is cut shorter than _search keeps it).
+        return "\n\n".join([
+            f"[{i}] From {source.get('source', 'Unknown')}: '{source.get('title', 'Unknown')[:70]}'\n"
+            f"    {source.get('content', '')[:180]}..."
+            for i, source in enumerate(sources[:4], 1)
+        ])
     
     def create_fast_prompt(self, question: str, persona_name: str, context: List[Dict]) -> str:
         """Create optimized prompt for fast responses"""
-        persona = self.personas.get(persona_name, self.personas['camus'])
+        persona = self.personas.get(persona_name) or self.personas['camus']
         
         # Minimal context formatting for speed
         context_text = ""
@@ -200,34 +282,139 @@ Engage with this question through your unique philosophical lens. Focus on {pers
                 "stream": False
             }
             
-            print(f"🧠 Generating with {model.name}...")
-            response = requests.post(
+            logger.debug("Generating with %s", model.name)
+            response = self.http.post(
                 f"{self.base_url}/chat/completions",
                 headers=self.headers,
-                json=payload,
-                timeout=30
+                timeout=30,
+                **{self._body_param: _dumps(payload)}
             )
+            # Any answer, even an error status, means the connection is open and pooled
+            self._mark_connection_used()
             
             if response.status_code == 200:
-                result = response.json()
+                result = _loads(response.content)
                 generated_text = result['choices'][0]['message']['content'].strip()
                 
                 if len(generated_text) > 50:  # Valid response
-                    print(f"✅ Success with {model.name}")
+                    logger.debug("Success with %s", model.name)
                     return generated_text
                     
             elif response.status_code == 429:
-                print(f"⏳ {model.name} rate limited, trying next model...")
+                logger.warning("%s rate limited, trying next model", model.name)
             else:
-                print(f"❌ {model.name} failed: {response.status_code}")
-                if response.text:
-                    print(f"   Error: {response.text[:100]}")
+                logger.warning("%s failed: %s %s", model.name, response.status_code, response.text[:100])
                 
         except Exception as e:
-            print(f"❌ Error with {model.name}: {e}")
+            logger.warning("Error with %s: %s", model.name, e)
             
         return None
     
+    def _query_first_model(self, prompt: str) -> Optional[str]:
+        """Query models in order and return the first valid response. The next model starts as
+        soon as one fails (e.g. rate limited) or after HEDGE_DELAY_SECONDS without an answer, so a
+        hanging model doesn't add its full timeout but a healthy one answers alone."""
+        models = self.models
+        launched = 0
+        pending = set()
+        try:
+            while True:
+                if launched < len(models):
+                    pending.add(_model_pool.submit(self.query_groq_model, models[launched], prompt))
+                    launched += 1
+                if not pending:
+                    return None
+                done, pending = wait(
+                    pending,
+                    timeout=self.HEDGE_DELAY_SECONDS if launched < len(models) else None,
+                    return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    response = future.result()
+                    if response:
+                        return response
+        finally:
+            # Queries already sent can't be recalled, but queued ones needn't start
+            for future in pending:
+                future.cancel()
+    
+    def stream_groq_model(self, model: GroqModel, prompt: str) -> Iterator[str]:
+        """Stream a completion from a specific Groq model, yielding text deltas as they arrive"""
+        payload = {
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "model": model.id,
+            "temperature": 0.7,
+            "max_tokens": 600,
+            "top_p": 0.9,
+            "stream": True
+        }
+        
+        logger.debug("Streaming with %s", model.name)
+        # Server-sent events: one "data: {...}" line per delta, then "data: [DONE]"
+        for line in self._stream_lines(f"{self.base_url}/chat/completions", payload):
+            if not line or not line.startswith('data: '):
+                continue
+            data = line[6:]
+            if data == '[DONE]':
+                break
+            delta = _loads(data)['choices'][0].get('delta', {}).get('content')
+            if delta:
+                yield delta
+    
+    def _stream_lines(self, url: str, payload: Dict) -> Iterator[str]:
+        """POST and yield the decoded response lines as they arrive (httpx or requests client)"""
+        body = _dumps(payload)
+        # httpx clients stream through .stream(); on a requests.Session `stream` is a plain flag
+        if callable(getattr(self.http, 'stream', None)):
+            with self.http.stream('POST', url, headers=self.headers, content=body, timeout=30) as response:
+                self._mark_connection_used()
+                response.raise_for_status()
+                yield from response.iter_lines()
+        else:
+            with self.http.post(url, headers=self.headers, data=body, timeout=30, stream=True) as response:
+                self._mark_connection_used()
+                response.raise_for_status()
+                yield from response.iter_lines(chunk_size=None, decode_unicode=True)
+    
+    def chat_stream(self, question: str, persona: str = 'camus') -> Iterator[str]:
+        """Generate a philosophical response like chat(), yielding it piece by piece as Groq produces it"""
+        cached = self._cached_response(question, persona)
+        if cached:
+            yield cached
+            return
+        
+        try:
+            internet_sources = self._search_sources(question, persona)
+        except Exception as e:
+            logger.warning("Search error: %s", e)
+            internet_sources = []
+        
+        prompt = self.create_philosophical_prompt(question, persona, internet_sources)
+        
+        for model in self.models:
+            parts = []
+            try:
+                for delta in self.stream_groq_model(model, prompt):
+                    parts.append(delta)
+                    yield delta
+                if parts:
+                    logger.debug("Success with %s", model.name)
+                    self._cache_response(question, persona, ''.join(parts).strip())
+                    return
+            except Exception as e:
+                logger.warning("Error with %s: %s", model.name, e)
+                # Part of an answer already reached the client - don't splice in another model's
+                if parts:
+                    return
+        
+        logger.warning("All Groq models failed, using enhanced fallback")
+        yield self._create_enhanced_fallback(question, persona, internet_sources)
+    
     def chat(self, question: str, persona: str = 'camus', fast_mode: bool = False) -> str:
         """Generate philosophical response using Groq with internet context
         
@@ -236,42 +423,131 @@ Engage with this question through your unique philosophical lens. Focus on {pers
             persona: Philosopher persona (camus, nietzsche, etc.)
             fast_mode: If False (default), uses enhanced search for better responses
         """
+        return self.chat_with_status(question, persona, fast_mode)[0]
+    
+    def chat_with_status(self, question: str, persona: str = 'camus', fast_mode: bool = False) -> Tuple[str, bool]:
+        """Like chat(), returning (response, generated) - generated is False for the template
+        fallbacks used when no model answered, which callers should not cache"""
+        cached = self._cached_response(question, persona)
+        if cached:
+            return cached, True
+        
         try:
             # Step 1: Get internet context (enhanced by default for quality)
-            if fast_mode:
-                print(f"⚡ Fast search for: {question}")
-                # Use original fast method if available, otherwise enhanced
-                try:
-                    internet_sources = self.search_engine.search_philosophy_content_fast(question, persona)
-                except AttributeError:
-                    internet_sources = self.search_engine.search_philosophy_content(question, persona)
-                print(f"✅ Found {len(internet_sources)} sources in fast mode")
-            else:
-                print(f"🧠 Enhanced search for: {question}")
-                # Use enhanced search method for better quality
-                internet_sources = self.search_engine.search_philosophy_content(question, persona)
-                print(f"✅ Found {len(internet_sources)} quality sources")
+            internet_sources = self._search_sources(question, persona, fast_mode)
             
             # Step 2: Create enhanced prompt (always use philosophical for quality)
             prompt = self.create_philosophical_prompt(question, persona, internet_sources)
             
-            # Step 3: Try Groq models (start with fastest)
-            for model in self.models:
-                response = self.query_groq_model(model, prompt)
-                if response:
-                    return response
+            # Step 3: Ask the preferred Groq model, hedging to the next ones if it is slow or fails
+            response = self._query_first_model(prompt)
+            if response:
+                self._cache_response(question, persona, response)
+                return response, True
             
             # If all models fail, use enhanced fallback
-            print("⚠️ All Groq models failed, using enhanced fallback")
-            return self._create_enhanced_fallback(question, persona, internet_sources)
+            logger.warning("All Groq models failed, using enhanced fallback")
+            return self._create_enhanced_fallback(question, persona, internet_sources), False
             
         except Exception as e:
-            print(f"❌ Complete system error: {e}")
-            return self._create_basic_fallback(question, persona)
+            logger.warning("Complete system error: %s", e)
+            return self._create_basic_fallback(question, persona), False
+    
+    def chat_many(self, jobs: List[Tuple[str, str]], max_concurrency: int = 4) -> List[str]:
+        """Answer several (question, persona) pairs, keeping up to max_concurrency chats in flight
+        (a cap that stays under Groq's free-tier rate limits); results keep input order"""
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='groq-chat') as pool:
+            return list(pool.map(lambda job: self.chat(*job), jobs))
+    
+    def _search_sources(self, question: str, persona: str, fast_mode: bool = False) -> List[Dict]:
+        """Run the internet search in the background while the Groq connection is warmed, then wait for it"""
+        search = _search_pool.submit(self._search, question, persona, fast_mode)
+        self._warm_connection()
+        try:
+            return search.result(timeout=self.SEARCH_TIMEOUT_SECONDS)
+        except FuturesTimeoutError:
+            logger.warning("Search took over %ss, answering without it", self.SEARCH_TIMEOUT_SECONDS)
+            return []
+    
+    def _search(self, question: str, persona: str, fast_mode: bool) -> List[Dict]:
+        if fast_mode:
+            logger.debug("Fast search")
+            # Use original fast method if available, otherwise enhanced
+            try:
+                internet_sources = self.search_engine.search_philosophy_content_fast(question, persona)
+            except AttributeError:
+                internet_sources = self.search_engine.search_philosophy_content(question, persona)
+            logger.debug("Found %d sources in fast mode", len(internet_sources))
+        else:
+            logger.debug("Enhanced search")
+            # Use enhanced search method for better quality
+            internet_sources = self.search_engine.search_philosophy_content(question, persona)
+            logger.debug("Found %d quality sources", len(internet_sources))
+        # Keep only what the prompt and fallbacks use, so long scraped pages are copied once here
+        # and not held for the rest of the chat
+        return [
+            {
+                'title': source.get('title', 'Unknown')[:70],
+                'content': source.get('content', '')[:250],
+                'source': source.get('source', 'Unknown')
+            }
+            for source in internet_sources[:4]
+        ]
+    
+    def _mark_connection_used(self):
+        with self._connection_lock:
+            self._connection_used_at = time.monotonic()
+    
+    def _warm_connection(self):
+        """Open the TLS connection to Groq ahead of the first model call, unless one is likely still pooled"""
+        now = time.monotonic()
+        with self._connection_lock:
+            # Claimed under the lock, so concurrent chats send one warm-up between them
+            if now - self._connection_used_at < self.CONNECTION_IDLE_SECONDS:
+                return
+            self._connection_used_at = now
+        try:
+            self.http.head(self.base_url, timeout=3.05)
+        except Exception as e:
+            logger.warning("Could not pre-connect to Groq: %s", e)
+    
+    def _cache_namespace(self, persona: str) -> str:
+        # Unknown personas are answered as Camus, so they share Camus' cached answers. The
+        # prefix keeps these apart from other users of a shared response cache.
+        return f"groq:{persona if persona in self.personas else 'camus'}"
+    
+    @staticmethod
+    def _cache_text(question: str) -> str:
+        # Normalized like the route's cache key, so a shared cache embeds each message once
+        return ' '.join(question.lower().split())
+    
+    def _cached_response(self, question: str, persona: str) -> Optional[str]:
+        """Return a stored answer to the same or a near-identical question for this persona, if any"""
+        namespace = self._cache_namespace(persona)
+        text = self._cache_text(question)
+        with self._exact_cache_lock:
+            cached = self._exact_cache.get((namespace, text))
+        if cached:
+            logger.debug("Exact cache hit")
+            return cached
+        if self.response_cache is None:
+            return None
+        cached = self.response_cache.lookup(namespace, text)
+        if cached:
+            logger.debug("Semantic cache hit")
+        return cached
+    
+    def _cache_response(self, question: str, persona: str, response: str):
+        namespace = self._cache_namespace(persona)
+        text = self._cache_text(question)
+        with self._exact_cache_lock:
+            self._exact_cache[(namespace, text)] = response
+        if self.response_cache is not None:
+            self.response_cache.store(namespace, text, response)
     
     def _create_enhanced_fallback(self, question: str, persona: str, sources: List[Dict]) -> str:
         """Create intelligent fallback using internet content"""
-        persona_info = self.personas.get(persona, self.personas['camus'])
+        persona_info = self.personas.get(persona) or self.personas['camus']
         
         if sources:
             key_content = sources[0].get('content', '')[:250]
@@ -292,7 +568,7 @@ The path forward requires us to embrace both the uncertainty and the responsibil
     
     def _create_basic_fallback(self, question: str, persona: str) -> str:
         """Basic philosophical response when everything fails"""
-        persona_info = self.personas.get(persona, self.personas['camus'])
+        persona_info = self.personas.get(persona) or self.personas['camus']
         
         return f"""As {persona_info['name']}, I find your question "{question}" strikes at the heart of what it means to be human.
 
@@ -317,12 +593,14 @@ def test_groq_chat():
             ("What is the nature of human suffering?", "dostoevsky")
         ]
         
-        for question, philosopher in test_questions:
+        # Ask all questions at once; total time is the slowest answer, not the sum
+        responses = chat.chat_many(test_questions)
+        
+        for (question, philosopher), response in zip(test_questions, responses):
             print(f"\n📝 Question: {question}")
             print(f"🎭 Philosopher: {philosopher.title()}")
             print("-" * 50)
             
-            response = chat.chat(question, philosopher)
             print(f"🤖 Response:\n{response}")
             print("\n" + "="*60)
             
@@ -0,0 +1,82 @@
+"""
+Pooled HTTP sessions for outbound API calls (Groq, Hugging Face, search)
+
+Reusing one keep-alive connection pool per host avoids a fresh TCP + TLS
+handshake on every chat request.
+"""
+
+import atexit
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HTTP2_CLIENT = None
+
+
+def new_http_session() -> requests.Session:
+    """Create a session with a large keep-alive pool and retries on connection errors"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=20,
+        pool_maxsize=100,
+        # POSTs are only retried when the connection could not be made, never after a read
+        max_retries=Retry(total=3, backoff_factor=0.2)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = new_http_session()
+    return _SESSION
+
+
+def get_http2_client():
+    """
+    Return the process-wide HTTP/2 client, or None when httpx[http2] is not installed.
+    Concurrent requests to one host multiplex over a single TLS connection.
+    """
+    global _HTTP2_CLIENT
+    if not HTTP2_AVAILABLE:
+        return None
+    if _HTTP2_CLIENT is None:
+        with _SESSION_LOCK:
+            if _HTTP2_CLIENT is None:
+                _HTTP2_CLIENT = httpx.Client(transport=httpx.HTTPTransport(
+                    http2=True,
+                    limits=httpx.Limits(max_connections=32, max_keepalive_connections=8),
+                    # Retries only cover failed connection attempts, as in new_http_session
+                    retries=3
+                ))
+                atexit.register(_HTTP2_CLIENT.close)
+    return _HTTP2_CLIENT
+
+
+def _reset_after_fork():
+    # Pooled sockets must not be shared between a parent and its forked workers
+    global _SESSION, _SESSION_LOCK, _HTTP2_CLIENT
+    _SESSION = None
+    _HTTP2_CLIENT = None
+    _SESSION_LOCK = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -7,20 +7,41 @@ Searches web, Reddit, academic papers, and philosophy forums in real-time
 import os
 import requests
 import json
+import threading
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import urllib.parse
 from datetime import datetime
 import logging
 
+from app.utils.http_client import get_http_session, new_http_session
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+def _run_native_io(func, *args, **kwargs):
+    """Run a call whose network I/O bypasses Python sockets (ddgs uses a Rust HTTP client).
+
+    Under gevent-patched workers such a call would block every greenlet in the
+    process, so it is handed to gevent's native thread pool instead.
+    """
+    try:
+        from gevent import get_hub, monkey
+        if monkey.is_module_patched('socket'):
+            return get_hub().threadpool.apply(func, args, kwargs)
+    except ImportError:
+        pass
+    return func(*args, **kwargs)
+
 class InternetRAGEngine:
     """Real-time internet search RAG for deep philosophical conversations"""
     
     def __init__(self):
-        self.session = requests.Session()
+        # Own pooled session: the browser User-Agent below is only meant for search sites
+        self.session = new_http_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
@@ -133,7 +154,7 @@ class InternetRAGEngine:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = self.session.post(url, json=payload, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -173,7 +194,7 @@ class InternetRAGEngine:
             
             results = []
             with ddgs.DDGS() as ddgs_client:
-                search_results = ddgs_client.text(query, max_results=8)
+                search_results = _run_native_io(ddgs_client.text, query, max_results=8)
                 for result in search_results:
                     results.append({
                         'title': result.get('title', ''),
@@ -194,7 +215,7 @@ class InternetRAGEngine:
                 
                 results = []
                 with ddgs.DDGS() as ddgs_client:
-                    search_results = ddgs_client.text(query, max_results=8)
+                    search_results = _run_native_io(ddgs_client.text, query, max_results=8)
                     for result in search_results:
                         results.append({
                             'title': result.get('title', ''),
@@ -671,11 +692,30 @@ class InternetRAGEngine:
         # Sort by final relevance score
         return sorted(results, key=lambda x: x.get('final_relevance_score', 0), reverse=True)
 
+def get_internet_rag_engine() -> InternetRAGEngine:
+    """Return the process-wide search engine, creating it on first use"""
+    global _ENGINE
+    if _ENGINE is None:
+        with _ENGINE_LOCK:
+            if _ENGINE is None:
+                _ENGINE = InternetRAGEngine()
+    return _ENGINE
+
+def _reset_after_fork():
+    # The engine's pooled session must not be shared between a parent and its forked workers
+    global _ENGINE, _ENGINE_LOCK
+    _ENGINE = None
+    _ENGINE_LOCK = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
 class ModernPhilosopherChat:
     """AI Philosopher Chat with Internet-powered RAG"""
     
-    def __init__(self):
+    def __init__(self, http_session: Optional[requests.Session] = None):
         self.internet_rag = InternetRAGEngine()
+        self.http = http_session or get_http_session()
         self.huggingface_api_key = os.getenv('HUGGINGFACE_API_KEY')
         
         # Use working models that are available for free
@@ -760,7 +800,7 @@ Response:"""
                 }
             }
             
-            response = requests.post(model_url, headers=headers, json=payload, timeout=30)
+            response = self.http.post(model_url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -0,0 +1,183 @@
+"""
+Semantic response cache - answers a prompt with the stored response of a
+sufficiently similar earlier prompt, so rephrased questions skip the LLM call
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from cachetools import LRUCache
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class _Namespace:
+    """
+    Embeddings and values cached for one namespace (e.g. one philosopher), oldest first.
+    Rows live in a preallocated float32 buffer; the live rows are the contiguous
+    slice [start, end), so appends are amortized O(1) and eviction just moves `start`.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', 'values', 'stored_at')
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.buffer = np.empty((capacity, dim), dtype=np.float32)
+        self.start = 0
+        self.end = 0
+        self.values = []
+        self.stored_at = []
+
+    @property
+    def dim(self) -> int:
+        return self.buffer.shape[1]
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self.buffer[self.start:self.end]
+
+    def append(self, vector: np.ndarray, value: Any, stored_at: float):
+        if self.end == len(self.buffer):
+            count = self.end - self.start
+            if count * 2 > len(self.buffer):
+                # Mostly live rows: double the buffer
+                grown = np.empty((len(self.buffer) * 2, self.dim), dtype=np.float32)
+                grown[:count] = self.vectors
+                self.buffer = grown
+            else:
+                # Mostly evicted rows: compact in place
+                self.buffer[:count] = self.vectors
+            self.start, self.end = 0, count
+        self.buffer[self.end] = vector
+        self.end += 1
+        self.values.append(value)
+        self.stored_at.append(stored_at)
+
+    def drop_oldest(self, count: int):
+        self.start += count
+        del self.values[:count]
+        del self.stored_at[:count]
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache partitioned by namespace, so one persona's
+    answers are never served for another's. Entries are unit-normalized
+    embeddings scanned with a single matrix-vector product; a lookup hits when
+    the best cosine similarity reaches `threshold`. Each namespace keeps at most
+    `max_entries` entries for `ttl` seconds.
+
+    `embed` maps text to a vector; by default a SentenceTransformer model is
+    loaded on first use. If no embedder is available every lookup misses.
+    The last `embedding_cache_size` embeddings are memoized by text, so a miss
+    followed by a store, or a repeat after the exact cache expired, embeds once.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 2000,
+        ttl: float = 3600,
+        embed: Optional[Callable[[str], Any]] = None,
+        model_name: Optional[str] = None,
+        embedding_cache_size: int = 512
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.model_name = model_name or os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self._embed_fn = embed
+        self._embed_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._embeddings = LRUCache(maxsize=embedding_cache_size)
+
+    def _embedder(self) -> Optional[Callable[[str], Any]]:
+        """Return the embedding function, loading the default model on first use"""
+        if self._embed_fn is None and SENTENCE_TRANSFORMERS_AVAILABLE:
+            with self._embed_lock:
+                if self._embed_fn is None:
+                    try:
+                        model = SentenceTransformer(self.model_name)
+                        self._embed_fn = model.encode
+                    except Exception as e:
+                        logger.warning("Semantic cache disabled, embedding model failed to load: %s", e)
+                        self._embed_fn = False
+        return self._embed_fn or None
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._embeddings.get(text)
+        if vector is not None:
+            return vector
+        embed = self._embedder()
+        if embed is None:
+            return None
+        vector = np.asarray(embed(text), dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        if not norm:
+            return None
+        vector /= norm
+        with self._lock:
+            self._embeddings[text] = vector
+        return vector
+
+    def _expire(self, namespace: _Namespace, now: float):
+        """Drop entries older than the TTL - they are a prefix since entries are kept in insertion order"""
+        expired = bisect.bisect_left(namespace.stored_at, now - self.ttl)
+        if expired:
+            namespace.drop_oldest(expired)
+
+    def lookup(self, namespace: str, text: str) -> Optional[Any]:
+        """Return the value stored for the most similar text in the namespace, if similar enough"""
+        with self._lock:
+            if not self._namespaces.get(namespace):
+                return None
+        vector = self._embed(text)
+        if vector is None:
+            return None
+        with self._lock:
+            cached = self._namespaces.get(namespace)
+            if cached is None:
+                return None
+            self._expire(cached, time.monotonic())
+            if not cached.values:
+                return None
+            scores = cached.vectors @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return cached.values[best]
+        return None
+
+    def store(self, namespace: str, text: str, value: Any):
+        """Cache a value under the embedding of `text` in the namespace"""
+        vector = self._embed(text)
+        if vector is None:
+            return
+        with self._lock:
+            cached = self._namespaces.get(namespace)
+            if cached is None or cached.dim != vector.shape[0]:
+                cached = self._namespaces[namespace] = _Namespace(vector.shape[0])
+            now = time.monotonic()
+            self._expire(cached, now)
+            if len(cached.values) >= self.max_entries:
+                cached.drop_oldest(len(cached.values) - self.max_entries + 1)
+            cached.append(vector, value, now)
+
+    def clear(self):
+        with self._lock:
+            self._namespaces.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(cached.values) for cached in self._namespaces.values())
@@ -0,0 +1,146 @@
+"""
+Replayable buffers for streamed chat responses
+
+Generation writes its SSE events into a buffer independently of the HTTP
+response, so a client that drops mid-stream can reconnect with Last-Event-ID
+and continue from the next event instead of paying for a second LLM call.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.utils.conversation_store import REDIS_STORE_AVAILABLE, get_redis_client
+
+logger = logging.getLogger(__name__)
+
+STREAM_TTL_SECONDS = int(os.environ.get('STREAM_TTL_SECONDS', 300))
+
+
+class StreamBuffer:
+    """Events of one stream, kept in this process"""
+
+    def __init__(self):
+        self._events = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    def append(self, event: str):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def read_from(self, index: int, idle_timeout: float = 60) -> Iterator[Tuple[int, str]]:
+        """Yield (index, event) from `index` on, following live until the stream finishes"""
+        while True:
+            with self._cond:
+                if not self._cond.wait_for(lambda: index < len(self._events) or self._done, idle_timeout):
+                    return
+                pending = self._events[index:]
+                done = self._done
+            for event in pending:
+                yield index, event
+                index += 1
+            if done:
+                return
+
+
+class StreamBuffers:
+    """In-process registry of recent streams - resuming only works on the worker that started it"""
+
+    def __init__(self, ttl: float = STREAM_TTL_SECONDS, max_streams: int = 1024):
+        self._buffers = TTLCache(maxsize=max_streams, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def create(self, stream_id: str) -> StreamBuffer:
+        buffer = StreamBuffer()
+        with self._lock:
+            self._buffers[stream_id] = buffer
+        return buffer
+
+    def get(self, stream_id: str) -> Optional[StreamBuffer]:
+        with self._lock:
+            return self._buffers.get(stream_id)
+
+
+class RedisStreamBuffer:
+    """
+    Events of one stream in a Redis list `stream:{id}` (list index = event id), with a
+    `stream:{id}:done` marker once complete. Readers on any worker poll for new events.
+    """
+
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, client, stream_id: str, ttl: int):
+        self.client = client
+        self.key = f"stream:{stream_id}"
+        self.done_key = f"{self.key}:done"
+        self.ttl = ttl
+
+    def append(self, event: str):
+        pipe = self.client.pipeline()
+        pipe.rpush(self.key, event)
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def finish(self):
+        pipe = self.client.pipeline()
+        pipe.set(self.done_key, 1, ex=self.ttl)
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def read_from(self, index: int, idle_timeout: float = 60) -> Iterator[Tuple[int, str]]:
+        """Yield (index, event) from `index` on, following live until the stream finishes"""
+        last_event_at = time.monotonic()
+        while True:
+            # Check the marker before reading so the final read includes every event
+            done = self.client.exists(self.done_key)
+            events = self.client.lrange(self.key, index, -1)
+            for event in events:
+                yield index, event.decode('utf-8')
+                index += 1
+            if done:
+                return
+            now = time.monotonic()
+            if events:
+                last_event_at = now
+            elif now - last_event_at > idle_timeout:
+                return
+            time.sleep(self.POLL_INTERVAL)
+
+
+class RedisStreamBuffers:
+    """Registry of streams shared by every worker through Redis"""
+
+    def __init__(self, client, ttl: int = STREAM_TTL_SECONDS):
+        self.client = client
+        self.ttl = ttl
+
+    def create(self, stream_id: str) -> RedisStreamBuffer:
+        buffer = RedisStreamBuffer(self.client, stream_id, self.ttl)
+        # Register the stream before its first event so an early reconnect finds it
+        self.client.set(f"{buffer.key}:started", 1, ex=self.ttl)
+        return buffer
+
+    def get(self, stream_id: str) -> Optional[RedisStreamBuffer]:
+        buffer = RedisStreamBuffer(self.client, stream_id, self.ttl)
+        if self.client.exists(f"{buffer.key}:started", buffer.key):
+            return buffer
+        return None
+
+
+def create_stream_buffers():
+    """Return Redis-backed stream buffers when REDIS_URL is set, else in-process ones"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url and REDIS_STORE_AVAILABLE:
+        return RedisStreamBuffers(get_redis_client(redis_url))
+    return StreamBuffers()
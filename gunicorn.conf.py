@@ -0,0 +1,33 @@
+"""
+Gunicorn settings for production:
+
+    gunicorn -c gunicorn.conf.py run:app
+
+Chat requests spend nearly all their time waiting on Groq / search HTTP calls,
+so workers are gevent-based: a blocked socket yields to other requests instead
+of parking the whole worker. Patching happens here, before the app (and
+requests/urllib3) is imported, so those calls cooperate.
+"""
+import os
+
+try:
+    from gevent import monkey
+    monkey.patch_all()
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+except ImportError:
+    # No gevent: fall back to threaded workers, which still overlap network waits
+    worker_class = 'gthread'
+    threads = int(os.environ.get('WORKER_THREADS', 8))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+timeout = 120
+# Import the app once in the master so workers share its modules copy-on-write;
+# the chat system itself is still built per worker in post_fork
+preload_app = os.environ.get('PRELOAD_APP', 'true').lower() == 'true'
+
+def post_fork(server, worker):
+    """Build the chat system inside each worker, never in the (preloading) parent"""
+    from app.routes import _init_chat
+    _init_chat()
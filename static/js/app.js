@@ -249,51 +249,24 @@ class SocrAItesChat {
             }
 
             // Process streaming response
-            const reader = response.body.getReader();
-            const decoder = new TextDecoder();
-            let buffer = '';
+            const streamId = response.headers.get('X-Stream-Id');
+            const streamState = { lastEventId: -1 };
             let streamCompleted = false;
+            try {
+                streamCompleted = await this.readChatStream(response, textElement, streamState);
+            } catch (streamError) {
+                console.warn('Stream interrupted:', streamError);
+            }
 
-            while (true) {
-                const { done, value } = await reader.read();
-                
-                if (done) break;
-                
-                buffer += decoder.decode(value, { stream: true });
-                const lines = buffer.split('\n');
-                buffer = lines.pop(); // Keep incomplete line in buffer
-                
-                for (const line of lines) {
-                    if (line.startsWith('data: ')) {
-                        try {
-                            const data = JSON.parse(line.slice(6));
-                            
-                            if (data.type === 'content') {
-                                // Update content with typing effect
-                                textElement.textContent = data.text;
-                                this.scrollToBottom();
-                            } else if (data.type === 'complete') {
-                                // Final update
-                                textElement.textContent = data.text;
-                                this.scrollToBottom();
-                                streamCompleted = true;
-                                break;
-                            }
-                        } catch (e) {
-                            console.warn('Failed to parse streaming data:', e);
-                        }
-                    }
-                }
-
-                // Stop waiting for more chunks once completion event is received.
-                if (streamCompleted) {
-                    try {
-                        await reader.cancel();
-                    } catch (cancelError) {
-                        console.warn('Reader cancel warning:', cancelError);
-                    }
-                    break;
+            // Resume a dropped stream from the last received event instead of regenerating the answer
+            if (!streamCompleted && streamId) {
+                const resumed = await fetch(`/api/chat/stream/${streamId}`, {
+                    headers: { 'Last-Event-ID': String(streamState.lastEventId) }
+                });
+                if (!resumed.ok) {
+                    throw new Error(`HTTP error! status: ${resumed.status}`);
                 }
+                await this.readChatStream(resumed, textElement, streamState);
             }
 
         } catch (error) {
@@ -445,6 +418,60 @@ class SocrAItesChat {
         }
     }
 
+    async readChatStream(response, textElement, state) {
+        // Returns true once the completion event arrives; state.lastEventId tracks the last event applied
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let eventId = null; // Id of the event being read, committed once its data has been applied
+
+        while (true) {
+            const { done, value } = await reader.read();
+            
+            if (done) return false;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop(); // Keep incomplete line in buffer
+            
+            for (const line of lines) {
+                if (line === '') {
+                    // Blank line ends the event, so its data is already on screen
+                    if (eventId !== null) {
+                        state.lastEventId = eventId;
+                        eventId = null;
+                    }
+                } else if (line.startsWith('id: ')) {
+                    eventId = parseInt(line.slice(4), 10);
+                } else if (line.startsWith('data: ')) {
+                    try {
+                        const data = JSON.parse(line.slice(6));
+                        
+                        if (data.type === 'content') {
+                            // Append each piece as the server streams it
+                            textElement.textContent += data.delta;
+                            this.scrollToBottom();
+                        } else if (data.type === 'complete') {
+                            // Final update
+                            textElement.textContent = data.text;
+                            this.scrollToBottom();
+
+                            // Stop waiting for more chunks once completion event is received.
+                            try {
+                                await reader.cancel();
+                            } catch (cancelError) {
+                                console.warn('Reader cancel warning:', cancelError);
+                            }
+                            return true;
+                        }
+                    } catch (e) {
+                        console.warn('Failed to parse streaming data:', e);
+                    }
+                }
+            }
+        }
+    }
+
     async handleVoiceModeResponse(message, aiMessageElement, textElement) {
         try {
             textElement.textContent = 'Thinking...';
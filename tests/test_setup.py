@@ -32,7 +32,7 @@ def test_philosopher_chat():
     chat = PhilosopherChat()
     
     # Test philosopher prompts
-    prompts = chat._load_philosopher_prompts()
+    prompts = chat.philosopher_prompts
     print(f"Loaded {len(prompts)} philosopher prompts:")
     for name in prompts.keys():
         print(f"  - {name}")